@@ -2,6 +2,7 @@ import json
 import logging
 from http import HTTPStatus
 
+import messages
 from flask import Flask, request
 from flask_migrate import Migrate
 from opentelemetry.instrumentation.flask import FlaskInstrumentor
@@ -16,7 +17,8 @@ from utils.limiter import get_limiter
 from schemas import ma
 from settings import api_settings as a_s
 from utils.tracer import configure_tracer
-from utils.cli import cli_bp
+from utils.cli import cli_bp, history_cli_bp, tokens_cli_bp
+from utils.password_hasher import PasswordHasherBusy
 
 
 logger = logging.getLogger(__name__)
@@ -48,6 +50,8 @@ app.register_blueprint(app_oauth)
 app.register_blueprint(swaggerui_blueprint)
 # CLI
 app.register_blueprint(cli_bp)
+app.register_blueprint(history_cli_bp)
+app.register_blueprint(tokens_cli_bp)
 
 
 if a_s.tracer_enable:
@@ -63,6 +67,13 @@ def before_request():
             return {'error': '\'X-Request-Id\' header is required'}, HTTPStatus.BAD_REQUEST
 
 
+@app.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(error):
+    # the request did not start hashing, so it can be safely retried
+    return ({'error': messages.ERR_PASSWORD_HASHING_BUSY}, HTTPStatus.SERVICE_UNAVAILABLE,
+            {'Retry-After': str(a_s.password_hashing_retry_after)})
+
+
 @app.route(API_URL)
 def create_swagger_spec():
     return json.dumps(get_apispec(app).to_dict())
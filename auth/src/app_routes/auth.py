@@ -5,11 +5,12 @@ from typing import Iterable
 from flask import request
 
 import messages
-from database.db_models import User
 from storage_token import get_storage_tokens
 from tokens import TokenType, validate_auth_header
+from user_cache import get_user_cache
 
 storage = get_storage_tokens()
+user_cache = get_user_cache()
 
 
 def authorization(token_type: TokenType = TokenType.access_token, safe_methods: Iterable | None = None,
@@ -22,7 +23,8 @@ def authorization(token_type: TokenType = TokenType.access_token, safe_methods:
     :param allowed_user_roles: List of user roles that are allowed to use the method. If it has string value '__all__',
             then the validation is skipped. The 'superuser' role is not restricted. Note, safe_methods parameter has
             higher priority, it means that if request method is in safe methods, user roles are not validated.
-    :return auth_data: the dict {'user': User, 'payload': list} (payload list fields, see tokens.generate_token)
+    :return auth_data: the dict {'user': UserPrincipal, 'payload': list} (payload list fields, see
+            tokens.generate_token). The principal is cached, the routes which change the user load it from the database.
     """
     def decorator(func):
         @wraps(func)
@@ -41,13 +43,13 @@ def authorization(token_type: TokenType = TokenType.access_token, safe_methods:
             if 'error' in validated:
                 return validated, HTTPStatus.UNAUTHORIZED
 
-            user = User.query.filter_by(id=validated.get('payload').get('user')).first()
+            user = user_cache.get(validated.get('payload').get('user'))
             if not user:
                 return {'error': messages.ERR_USER_NOT_FOUND}, HTTPStatus.NOT_FOUND
 
             if token_type is TokenType.refresh_token:
-                refresh_token = header.split()[1].encode('utf8')
-                if storage.check_refresh_token_is_valid(user.id, refresh_token) is False:
+                payload = validated['payload']
+                if storage.check_session_is_valid(user.id, payload.get('sid'), payload['jti']) is False:
                     return {'error': messages.ERR_REFRESH_TOKEN_NOT_EXIST}, HTTPStatus.UNAUTHORIZED
             auth_data = {'user': user, 'payload': validated['payload']}
 
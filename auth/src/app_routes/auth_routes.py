@@ -13,13 +13,16 @@ from .auth import authorization
 from database.db import db
 from database.db_models import LoginHistory, User, UserDeviceType
 from schemas import auth_schemas, history_schemas, user_schemas
+from services.login_history_writer import get_login_history_writer
 from storage_token import get_storage_tokens
-from tokens import TokenType, decode_token, generate_token
+from tokens import TokenType, decode_token, generate_session_tokens, generate_token, is_token_compromised
+from utils.password_hasher import get_password_hasher
 from utils.tracer import trace
 
 
 app_auth = Blueprint('auth_routes', __name__)
 storage = get_storage_tokens()
+login_history_writer = get_login_history_writer()
 
 
 @app_auth.route('/auth/signup/', methods=['POST'])
@@ -73,6 +76,11 @@ def login():
                 content:
                     application/json:
                         schema: TokensSchema
+            '503':
+                description: Все обработчики паролей заняты, запрос нужно повторить позже (Retry-After)
+                content:
+                    application/json:
+                        schema: OutputErrorSchema
         tags:
             - auth
     """
@@ -84,12 +92,15 @@ def login():
             return {'error': messages.ERR_USER_NOT_FOUND}, HTTPStatus.NOT_FOUND
         if not user.check_password(json_data.get('password')):
             return {'error': messages.ERR_WRONG_PASSWORD}, HTTPStatus.UNAUTHORIZED
+        if user.password_needs_rehash():
+            # the hash is upgraded to the target cost
+            user.set_password(json_data.get('password'))
+            db.session.commit()
     except BadRequest:
         return {'error': messages.ERR_DATA_INCORRECT}, HTTPStatus.BAD_REQUEST
     except ValidationError as e:
         return e.messages, HTTPStatus.UNPROCESSABLE_ENTITY
-    access_token = generate_token(user, TokenType.access_token)
-    refresh_token = generate_token(user, TokenType.refresh_token)
+    access_token, refresh_token = generate_session_tokens(user)
     # add tokens to storage
     storage.save_access_refresh_tokens(user.id, access_token, refresh_token)
     # add history
@@ -99,13 +110,8 @@ def login():
     if (parse_ua.is_mobile | parse_ua.is_tablet) is True:
         device_type = UserDeviceType.MOBILE
     if parse_ua.is_pc is True:
-        device_type = UserDeviceType.PS     
-    data = {'user_id': user.id,
-           'user_agent': user_agent,
-           'user_device_type': str(device_type),}
-    log = LoginHistory(**data)
-    db.session.add(log)
-    db.session.commit()
+        device_type = UserDeviceType.PS
+    login_history_writer.add(user.id, user_agent, device_type)
     return {'access_token': access_token, 'refresh_token': refresh_token}, HTTPStatus.OK
 
 
@@ -127,7 +133,9 @@ def refresh_access_token(auth_data: dict):
         tags:
             - auth
     """
-    access_token = generate_token(auth_data['user'], TokenType.access_token)
+    session_id = auth_data['payload']['sid']
+    access_token = generate_token(auth_data['user'], TokenType.access_token, session_id=session_id)
+    storage.update_session_access_token(auth_data['user'].id, session_id, access_token)
     return {'access_token': access_token}, HTTPStatus.OK
 
 
@@ -147,15 +155,30 @@ def logout(auth_data: dict):
             - auth
     """
     # add tokens to black list
-    jti = auth_data['payload']['jti']
-    storage.set_token_to_compromised(jti)
-    user_id = auth_data['user'].id
-    refresh_token = storage.get_refresh_token(user_id)
-    jti = decode_token(refresh_token, TokenType.refresh_token)['jti']
-    storage.set_token_to_compromised(jti, user_id)
+    payload = auth_data['payload']
+    storage.revoke_session(auth_data['user'].id, payload.get('sid'), payload)
     return {'detail': messages.TOKENS_REVOKED}, HTTPStatus.OK
 
 
+@app_auth.route('/auth/logout-all/', methods=['POST'])
+@authorization()
+def logout_all(auth_data: dict):
+    """
+    ---
+    post:
+        summary: Выход пользователя на всех устройствах
+        security:
+            - AccessToken: []
+        responses:
+            '200':
+                description: Сообщение "Access and refresh tokens of all sessions has been revoked"
+        tags:
+            - auth
+    """
+    storage.revoke_all_sessions(auth_data['user'].id, auth_data['payload'])
+    return {'detail': messages.ALL_TOKENS_REVOKED}, HTTPStatus.OK
+
+
 @app_auth.route('/auth/login-history/', methods=['GET'])
 @authorization()
 def login_history(auth_data: dict):
@@ -187,7 +210,11 @@ def login_history(auth_data: dict):
     except ValidationError as e:
         return e.messages, HTTPStatus.UNPROCESSABLE_ENTITY
     user_id = auth_data['user'].id
-    logs: Pagination = LoginHistory.query.filter_by(user_id=user_id).paginate(page, size, True, 1000)
+    # the logins buffered by this process are written before they are read
+    login_history_writer.flush()
+    # the latest logins first, they are read with the (user_id, date DESC) index
+    logs: Pagination = (LoginHistory.query.filter_by(user_id=user_id).order_by(LoginHistory.date.desc())
+                        .paginate(page, size, True, 1000))
     items = []
     for item in logs.items:
         items.append(
@@ -205,7 +232,7 @@ def login_history(auth_data: dict):
 
 
 @app_auth.route('/auth/tokens/is-in-black-list/', methods=['GET'])
-def is_token_compromised():
+def is_token_in_black_list():
     """
     ---
     get:
@@ -226,7 +253,7 @@ def is_token_compromised():
         request_data = request.args
         data = user_schemas.access_token_schema.load(request_data)
         payload = decode_token(data['access_token'], TokenType.access_token)
-        is_compromised = storage.check_token_is_compromised(payload['jti'])
+        is_compromised = is_token_compromised(payload)
     except BadRequest:
         return {'error': messages.ERR_DATA_INCORRECT}, HTTPStatus.BAD_REQUEST
     except ValidationError as e:
@@ -234,3 +261,26 @@ def is_token_compromised():
     except Exception as e:
         return {'error': str(e)}, HTTPStatus.BAD_REQUEST
     return {'is_compromised': is_compromised}, HTTPStatus.OK
+
+
+@app_auth.route('/auth/internal/password-hashing/stats/', methods=['GET'])
+@authorization(allowed_user_roles=['superuser'])
+def password_hashing_stats(auth_data: dict):
+    """
+    ---
+    get:
+        summary: Статистика хеширования паролей
+        description: Счетчики, глубина очереди и задержки (p50, p99, max в мс) ожидания и хеширования текущего
+            процесса. Доступна только суперпользователю.
+        security:
+            - AccessToken: []
+        responses:
+            '200':
+                description: Метрики хеширования паролей
+                content:
+                    application/json:
+                        schema: PasswordHashingStatsSchema
+        tags:
+            - auth
+    """
+    return get_password_hasher().get_stats(), HTTPStatus.OK
@@ -11,11 +11,17 @@ from .auth import authorization
 from database.db import db
 from database.db_models import User, UserRole
 from schemas.role_schemas import (role_detail_schema, role_list_schema, role_update_schema, 
-                                  user_provide_role_schema, query_user_id_schema)
+                                  user_provide_role_schema, query_user_id_schema, user_bulk_provide_role_schema)
+from services.role_service import (BULK_MAX_USERS, get_role_user_ids, provide_role_users, revoke_role_users,
+                                   revoke_users_access_tokens)
+from storage_token import get_storage_tokens
+from user_cache import get_user_cache
 from utils.tracer import trace
 
 
 app_role = Blueprint('role_routes', __name__)
+storage = get_storage_tokens()
+user_cache = get_user_cache()
 
 
 class ItemAPI(MethodView):
@@ -97,6 +103,8 @@ class ItemAPI(MethodView):
             item.name = data['name']
             self.session.add(item)
             self.session.commit()
+            # the cached principals keep the role names
+            user_cache.invalidate(get_role_user_ids(self.session, item.id))
         except BadRequest:
             return {'error': messages.ERR_DATA_INCORRECT}, HTTPStatus.BAD_REQUEST
         except IntegrityError as e:
@@ -127,8 +135,10 @@ class ItemAPI(MethodView):
             - roles
         """
         item = self._get_item(id)
+        user_ids = get_role_user_ids(self.session, item.id)
         self.session.delete(item)
         self.session.commit()
+        user_cache.invalidate(user_ids)
         return {'detail': 'Deleted'}, HTTPStatus.NO_CONTENT
 
 
@@ -263,6 +273,7 @@ def user_provide_role(*args, **kwargs):
         user.roles.append(role)
         db.session.add(user)
         db.session.commit()
+        user_cache.invalidate([user.id])
     except BadRequest:
         return {'error': messages.ERR_DATA_INCORRECT}, HTTPStatus.BAD_REQUEST
     except ValidationError as e:
@@ -314,6 +325,7 @@ def user_revoke_role(*args, **kwargs):
         role = UserRole.query.get_or_404(data.get('role_id', ''))
         user.roles.remove(role)
         db.session.commit()
+        user_cache.invalidate([user.id])
     except BadRequest:
         return {'error': messages.ERR_DATA_INCORRECT}, HTTPStatus.BAD_REQUEST
     except ValueError:
@@ -321,3 +333,105 @@ def user_revoke_role(*args, **kwargs):
     except ValidationError as e:
         return e.messages, HTTPStatus.UNPROCESSABLE_ENTITY
     return {'detail': messages.ROLE_REVOKED}, HTTPStatus.OK
+
+
+def _bulk_change_role(change_role, message: str):
+    """Change the role of the users in one query and revoke the access tokens of the changed users."""
+    try:
+        data = user_bulk_provide_role_schema.load(request.get_json())
+    except BadRequest:
+        return {'error': messages.ERR_DATA_INCORRECT}, HTTPStatus.BAD_REQUEST
+    except ValidationError as e:
+        return e.messages, HTTPStatus.UNPROCESSABLE_ENTITY
+    if len(data['user_ids']) > BULK_MAX_USERS:
+        return {'error': messages.ERR_TOO_MANY_USERS.format(BULK_MAX_USERS)}, HTTPStatus.BAD_REQUEST
+    if not UserRole.query.get(data['role_id']):
+        return {'error': messages.ERR_USER_ROLE_NOT_FOUND}, HTTPStatus.NOT_FOUND
+    affected = change_role(db.session, data['role_id'], data['user_ids'])
+    user_cache.invalidate(affected)
+    revoke_users_access_tokens(storage, affected)
+    return {'detail': message.format(len(affected))}, HTTPStatus.OK
+
+
+@app_role.route('/auth/roles/provide-bulk/', methods=['POST'])
+@authorization(allowed_user_roles=['superuser'])
+def users_provide_role(*args, **kwargs):
+    """
+    ---
+    post:
+        summary: Назначить роль списку пользователей
+        description: Пользователи, которых нет или у которых уже есть роль, пропускаются. 
+            Access-токены пользователей, получивших роль, отзываются.
+        security:
+            - AccessToken: []
+        requestBody:
+            content:
+                application/json:
+                    schema: UserBulkProvideRoleSchema
+        responses:
+            '200':
+                description: Роль назначена, в сообщении количество пользователей, получивших роль
+                content:
+                    application/json:
+                        schema: OutputDetailSchema
+            '400':
+                description: Не переданы данные или передано слишком много пользователей.
+                content:
+                    application/json:
+                        schema: OutputErrorSchema
+            '404':
+                description: Роль не найдена
+                content:
+                    application/json:
+                        schema: OutputErrorSchema
+            '422':
+                description: Ошибка валидации данных.
+                content:
+                    application/json:
+                        schema: OutputErrorSchema
+        tags:
+            - roles
+    """
+    return _bulk_change_role(provide_role_users, messages.ROLES_PROVIDED)
+
+
+@app_role.route('/auth/roles/revoke-bulk/', methods=['POST'])
+@authorization(allowed_user_roles=['superuser'])
+def users_revoke_role(*args, **kwargs):
+    """
+    ---
+    post:
+        summary: Отозвать роль у списка пользователей
+        description: Пользователи, у которых нет роли, пропускаются. 
+            Access-токены пользователей, потерявших роль, отзываются.
+        security:
+            - AccessToken: []
+        requestBody:
+            content:
+                application/json:
+                    schema: UserBulkProvideRoleSchema
+        responses:
+            '200':
+                description: Роль отозвана, в сообщении количество пользователей, потерявших роль
+                content:
+                    application/json:
+                        schema: OutputDetailSchema
+            '400':
+                description: Не переданы данные или передано слишком много пользователей.
+                content:
+                    application/json:
+                        schema: OutputErrorSchema
+            '404':
+                description: Роль не найдена
+                content:
+                    application/json:
+                        schema: OutputErrorSchema
+            '422':
+                description: Ошибка валидации данных.
+                content:
+                    application/json:
+                        schema: OutputErrorSchema
+        tags:
+            - roles
+    """
+    return _bulk_change_role(revoke_role_users, messages.ROLES_REVOKED)
@@ -14,10 +14,12 @@ from database.db_models import User
 from schemas.user_schemas import (change_password_schema, user_detail_schema, user_list_schema,
                                   user_sign_up_schema, user_with_roles_schema)
 from storage_token import get_storage_tokens
+from user_cache import get_user_cache
 
 
 app_user = Blueprint('user_routes', __name__)
 storage = get_storage_tokens()
+user_cache = get_user_cache()
 
 
 class ItemUserAPI(MethodView):
@@ -95,10 +97,11 @@ class ItemUserAPI(MethodView):
             json_data = request.get_json()
             data = self.user_sign_up_schema.load(json_data)
             user.email = data['email']
-            user.password = data['password']
+            user.set_password(data['password'])
             user.full_name = data['full_name']
             self.session.add(user)
             self.session.commit()
+            user_cache.invalidate([user.id])
         except BadRequest:
             return {'error': messages.ERR_DATA_INCORRECT}, HTTPStatus.BAD_REQUEST
         except IntegrityError as e:
@@ -128,6 +131,7 @@ class ItemUserAPI(MethodView):
         user = self._get_user(id)
         self.session.delete(user)
         self.session.commit()
+        user_cache.invalidate([user.id])
         return {'detail': messages.DELETED}, HTTPStatus.OK
 
 
@@ -182,8 +186,10 @@ def change_password(auth_data: dict):
     try:
         json_data = request.get_json()
         change_password_schema.load(json_data)
-        auth_data['user'].set_password(json_data.get('new_password'))
+        user = User.query.get(auth_data['user'].id)
+        user.set_password(json_data.get('new_password'))
         db.session.commit()
+        user_cache.invalidate([user.id])
     except BadRequest:
         return {'error': messages.ERR_DATA_INCORRECT}, HTTPStatus.BAD_REQUEST
     except ValidationError as e:
@@ -0,0 +1,51 @@
+"""
+Pick the bcrypt cost which fits the login latency budget.
+
+Every cost is measured several times on the current CPU, the highest cost whose median hashing time fits the budget
+is recommended for PASSWORD_HASHING_ROUNDS. Run it on the production hardware (e.g. inside the auth container):
+    python -m benchmarks.bcrypt_cost --budget-ms 250 --min-rounds 10 --max-rounds 15
+"""
+import argparse
+import statistics
+import time
+
+import bcrypt
+
+from settings import api_settings as _as
+
+
+def measure(rounds: int, samples: int) -> float:
+    """The median time in milliseconds of hashing a password with the cost."""
+    times = []
+    for _ in range(samples):
+        salt = bcrypt.gensalt(rounds)
+        started = time.perf_counter()
+        bcrypt.hashpw(b'benchmark-password', salt)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def run(budget_ms: float, min_rounds: int, max_rounds: int, samples: int) -> None:
+    recommended = None
+    print(f'{"cost":>6} {"median ms":>10}')
+    for rounds in range(min_rounds, max_rounds + 1):
+        elapsed = measure(rounds, samples)
+        print(f'{rounds:>6} {elapsed:>10.1f}')
+        if elapsed > budget_ms:
+            # every next cost takes twice as long
+            break
+        recommended = rounds
+    if recommended is None:
+        print(f'No cost from {min_rounds} fits {budget_ms} ms')
+        return
+    print(f'PASSWORD_HASHING_ROUNDS={recommended} (the current one is {_as.password_hashing_rounds})')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=250, help='the hashing time allowed for one login')
+    parser.add_argument('--min-rounds', type=int, default=10)
+    parser.add_argument('--max-rounds', type=int, default=15)
+    parser.add_argument('--samples', type=int, default=5, help='the measurements of every cost')
+    args = parser.parse_args()
+    run(args.budget_ms, args.min_rounds, args.max_rounds, args.samples)
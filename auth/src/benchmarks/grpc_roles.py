@@ -0,0 +1,86 @@
+"""
+Measure the throughput of the RolesControl gRPC server as the concurrency rises.
+
+GetUserInfo is called for the user, ProvideRoleUser is called in pairs with RevokeRoleUser: every concurrent client
+provides and revokes its own role, so the user roles stay the same. The roles are created by the benchmark with
+the 'benchmark-' name prefix. Run it inside the auth-grpc container (the user must exist):
+    python -m benchmarks.grpc_roles --user-id <uuid> --requests 2000 --concurrency 1 4 16 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from grpc import aio
+
+from grpc_control import roles_control_pb2, roles_control_pb2_grpc
+from settings import api_settings as _as
+
+
+async def measure(call, concurrency: int, requests: int) -> dict[str, float]:
+    """
+    Run the calls by concurrent clients.
+
+    :param call: the coroutine function making one call, it gets the client number.
+    :return: the requests per second, p50 and p99 latency in milliseconds.
+    """
+    latencies = []
+    counter = iter(range(requests))
+
+    async def client(number: int) -> None:
+        for _ in counter:
+            started = time.perf_counter()
+            await call(number)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        'rps': requests / elapsed,
+        'p50': percentiles[49] * 1000,
+        'p99': percentiles[98] * 1000,
+    }
+
+
+async def run(host: str, user_id: str, requests: int, concurrency: list[int]) -> None:
+    async with aio.insecure_channel(f'{host}:{_as.grpc_port}') as channel:
+        stub = roles_control_pb2_grpc.RolesControlStub(channel)
+        role_ids = []
+        for _ in range(max(concurrency)):
+            role = await stub.CreateRole(roles_control_pb2.NewRole(name=f'benchmark-{uuid.uuid4().hex[:16]}'))
+            role_ids.append(role.id)
+
+        async def get_user_info(number: int) -> None:
+            await stub.GetUserInfo(roles_control_pb2.Uuid(id=user_id))
+
+        async def provide_revoke_role(number: int) -> None:
+            request = roles_control_pb2.ProvideRole(user_id=user_id, role_id=role_ids[number],
+                                                    jti_to_compromised=uuid.uuid4().hex)
+            for method in (stub.ProvideRoleUser, stub.RevokeRoleUser):
+                result = await method(request)
+                if not result.successful:
+                    raise RuntimeError(f'{method} failed for the user {user_id}')
+
+        calls = {
+            'GetUserInfo': get_user_info,
+            'ProvideRoleUser+RevokeRoleUser': provide_revoke_role,
+        }
+        print(f'{"call":<32}{"concurrency":>12}{"rps":>10}{"p50, ms":>10}{"p99, ms":>10}')
+        for name, call in calls.items():
+            for clients in concurrency:
+                result = await measure(call, clients, requests)
+                print(f'{name:<32}{clients:>12}{result["rps"]:>10.1f}{result["p50"]:>10.3f}{result["p99"]:>10.3f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the RolesControl gRPC server')
+    parser.add_argument('--host', default='localhost', help='the gRPC server host')
+    parser.add_argument('--user-id', required=True, help='the UUID of an existing user')
+    parser.add_argument('--requests', type=int, default=2000, help='the number of calls per concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64],
+                        help='the numbers of concurrent clients')
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.user_id, args.requests, args.concurrency))
@@ -2,11 +2,10 @@ import uuid
 from datetime import datetime
 from enum import Enum
 
-import bcrypt
 from sqlalchemy.dialects.postgresql import BYTEA, UUID
-from sqlalchemy import UniqueConstraint
 
 from database.db import db
+from utils.password_hasher import get_password_hasher
 
 
 users_user_roles = db.Table(
@@ -22,7 +21,6 @@ class User(db.Model):
     email = db.Column(db.String, unique=True, nullable=False)
     full_name = db.Column(db.String)
     password = db.Column(BYTEA, nullable=False)
-    salt = db.Column(BYTEA, nullable=False)
     roles = db.relationship('UserRole', secondary=users_user_roles, lazy='subquery',
                             backref=db.backref('users', lazy=True))
     history_logs = db.relationship('LoginHistory', backref='user')
@@ -34,17 +32,21 @@ class User(db.Model):
             self.full_name = full_name
 
     @staticmethod
-    def encrypt_password(password: str) -> tuple[bytes, bytes]:
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode('utf8'), salt)
-        return hashed_password, salt
+    def encrypt_password(password: str) -> bytes:
+        return get_password_hasher().hash_password(password)
 
     def set_password(self, password: str):
-        self.password, self.salt = self.encrypt_password(password)
+        self.password = self.encrypt_password(password)
 
     def check_password(self, password: str) -> bool:
-        hashed_password = bcrypt.hashpw(password.encode('utf8'), self.salt)
-        return hashed_password == self.password
+        return get_password_hasher().check_password(password, self.password)
+
+    def password_needs_rehash(self) -> bool:
+        return get_password_hasher().needs_rehash(self.password)
+
+    @property
+    def role_names(self) -> list[str]:
+        return [str(r.name) for r in self.roles]
 
     def __str__(self):
         return f'<User: {self.email}>'
@@ -96,29 +98,31 @@ class UserDeviceType(Enum):
 
 
 def create_partition(target, connection, **kw) -> None:
-    """ creating partition by login_history """
-    connection.execute(
-        """CREATE TABLE IF NOT EXISTS "login_history_ps" PARTITION OF "login_history" FOR VALUES IN ('ps')"""
-    )
-    connection.execute(
-        """CREATE TABLE IF NOT EXISTS "login_history_mobile" PARTITION OF "login_history" FOR VALUES IN ('mobile')"""
-    )
-    connection.execute(
-        """CREATE TABLE IF NOT EXISTS "login_history_other" PARTITION OF "login_history" FOR VALUES IN ('other')"""
-    )
+    """ creating partition by login_history, the months partitions are created by flask history create-partitions """
+    for device_type in UserDeviceType:
+        connection.execute(
+            f"""CREATE TABLE IF NOT EXISTS "login_history_{device_type}" PARTITION OF "login_history" """
+            f"""FOR VALUES IN ('{device_type}') PARTITION BY RANGE (date)"""
+        )
+        connection.execute(
+            f"""CREATE TABLE IF NOT EXISTS "login_history_{device_type}_default" """
+            f"""PARTITION OF "login_history_{device_type}" DEFAULT"""
+        )
 
 
 class LoginHistory(db.Model):
     __tablename__ = 'login_history' 
     __table_args__ = (
-        UniqueConstraint('id', 'user_device_type'),
+        # the history of the user is read from the latest logins
+        db.Index('ix_login_history_user_id_date', 'user_id', db.text('date DESC')),
         {
             'postgresql_partition_by': 'LIST (user_device_type)',
             'listeners': [('after_create', create_partition)],
         }
     )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
-    date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # the primary key of a partitioned table includes the partition keys
+    date = db.Column(db.DateTime, primary_key=True, nullable=False, default=datetime.utcnow)
     user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id', ondelete="CASCADE"))
     user_agent = db.Column(db.String)
     user_device_type = db.Column(db.String, primary_key=True)
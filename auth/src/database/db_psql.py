@@ -7,5 +7,10 @@ from settings import api_settings as a_s
 
 db_uri = (f'postgresql://{a_s.auth_postgres_user}:{a_s.auth_postgres_password}'
           f'@{a_s.auth_postgres_host}:{a_s.auth_postgres_port}/{a_s.auth_postgres_db}')
-engine_psql = create_engine(db_uri)
+engine_psql = create_engine(db_uri,
+                            pool_size=a_s.grpc_db_pool_size,
+                            max_overflow=a_s.grpc_db_max_overflow,
+                            pool_timeout=a_s.grpc_db_pool_timeout,
+                            pool_recycle=a_s.grpc_db_pool_recycle,
+                            pool_pre_ping=a_s.grpc_db_pool_pre_ping)
 session_psql = sessionmaker(autocommit=False, autoflush=False, bind=engine_psql)
@@ -1,9 +1,18 @@
+from google.protobuf.internal import containers as _containers
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
-from typing import ClassVar as _ClassVar, Optional as _Optional
+from typing import ClassVar as _ClassVar, Iterable as _Iterable, Optional as _Optional
 
 DESCRIPTOR: _descriptor.FileDescriptor
 
+class BulkOperationResult(_message.Message):
+    __slots__ = ["affected", "successful"]
+    AFFECTED_FIELD_NUMBER: _ClassVar[int]
+    SUCCESSFUL_FIELD_NUMBER: _ClassVar[int]
+    affected: int
+    successful: bool
+    def __init__(self, successful: bool = ..., affected: _Optional[int] = ...) -> None: ...
+
 class NewRole(_message.Message):
     __slots__ = ["name"]
     NAME_FIELD_NUMBER: _ClassVar[int]
@@ -26,6 +35,14 @@ class ProvideRole(_message.Message):
     user_id: str
     def __init__(self, user_id: _Optional[str] = ..., role_id: _Optional[str] = ..., jti_to_compromised: _Optional[str] = ...) -> None: ...
 
+class ProvideRoleBulk(_message.Message):
+    __slots__ = ["role_id", "user_ids"]
+    ROLE_ID_FIELD_NUMBER: _ClassVar[int]
+    USER_IDS_FIELD_NUMBER: _ClassVar[int]
+    role_id: str
+    user_ids: _containers.RepeatedScalarFieldContainer[str]
+    def __init__(self, user_ids: _Optional[_Iterable[str]] = ..., role_id: _Optional[str] = ...) -> None: ...
+
 class Role(_message.Message):
     __slots__ = ["name", "role_id"]
     NAME_FIELD_NUMBER: _ClassVar[int]
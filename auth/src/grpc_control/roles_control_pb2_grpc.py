@@ -39,6 +39,16 @@ class RolesControlStub(object):
                 request_serializer=roles__control__pb2.ProvideRole.SerializeToString,
                 response_deserializer=roles__control__pb2.OperationResult.FromString,
                 )
+        self.ProvideRoleUsers = channel.unary_unary(
+                '/rolescontrol.RolesControl/ProvideRoleUsers',
+                request_serializer=roles__control__pb2.ProvideRoleBulk.SerializeToString,
+                response_deserializer=roles__control__pb2.BulkOperationResult.FromString,
+                )
+        self.RevokeRoleUsers = channel.unary_unary(
+                '/rolescontrol.RolesControl/RevokeRoleUsers',
+                request_serializer=roles__control__pb2.ProvideRoleBulk.SerializeToString,
+                response_deserializer=roles__control__pb2.BulkOperationResult.FromString,
+                )
 
 
 class RolesControlServicer(object):
@@ -74,6 +84,18 @@ class RolesControlServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ProvideRoleUsers(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RevokeRoleUsers(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_RolesControlServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -102,6 +124,16 @@ def add_RolesControlServicer_to_server(servicer, server):
                     request_deserializer=roles__control__pb2.ProvideRole.FromString,
                     response_serializer=roles__control__pb2.OperationResult.SerializeToString,
             ),
+            'ProvideRoleUsers': grpc.unary_unary_rpc_method_handler(
+                    servicer.ProvideRoleUsers,
+                    request_deserializer=roles__control__pb2.ProvideRoleBulk.FromString,
+                    response_serializer=roles__control__pb2.BulkOperationResult.SerializeToString,
+            ),
+            'RevokeRoleUsers': grpc.unary_unary_rpc_method_handler(
+                    servicer.RevokeRoleUsers,
+                    request_deserializer=roles__control__pb2.ProvideRoleBulk.FromString,
+                    response_serializer=roles__control__pb2.BulkOperationResult.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'rolescontrol.RolesControl', rpc_method_handlers)
@@ -196,3 +228,37 @@ class RolesControl(object):
             roles__control__pb2.OperationResult.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ProvideRoleUsers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/rolescontrol.RolesControl/ProvideRoleUsers',
+            roles__control__pb2.ProvideRoleBulk.SerializeToString,
+            roles__control__pb2.BulkOperationResult.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def RevokeRoleUsers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/rolescontrol.RolesControl/RevokeRoleUsers',
+            roles__control__pb2.ProvideRoleBulk.SerializeToString,
+            roles__control__pb2.BulkOperationResult.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
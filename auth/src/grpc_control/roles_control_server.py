@@ -1,74 +1,123 @@
-import grpc
+import asyncio
 import uuid
-import logging
-from concurrent import futures
+from concurrent.futures import Executor
 
 from grpc_control import roles_control_pb2_grpc
 from grpc_control import roles_control_pb2
 from database.db_models import User, UserRole
 from database.db_psql import session_psql
-from settings import api_settings as _as
+from services.role_service import (BULK_MAX_USERS, get_role_user_ids, provide_role_users, revoke_role_users,
+                                   revoke_users_access_tokens)
 from storage_token import get_storage_tokens
+from user_cache import get_user_cache
 
 
 class RolesControl(roles_control_pb2_grpc.RolesControlServicer):
+    """
+    The servicer of the grpc.aio server.
 
-    def __init__(self):
+    SQLAlchemy sessions are blocking, so every call runs in the executor, which is sized to the connection pool.
+    """
+    def __init__(self, executor: Executor):
         self.user_m = User
         self.role_m = UserRole
         self.session = session_psql
         self.storage = get_storage_tokens()
+        self.user_cache = get_user_cache()
+        self.executor = executor
 
-    def GetUserInfo(self, request, context):
+    async def GetUserInfo(self, request, context):
+        return await self._run(self._get_user_info, request)
+
+    async def CreateRole(self, request, context):
+        return await self._run(self._create_role, request)
+
+    async def UpdateRole(self, request, context):
+        return await self._run(self._update_role, request)
+
+    async def ProvideRoleUser(self, request, context):
+        return await self._run(self._provide_role_user, request)
+
+    async def RevokeRoleUser(self, request, context):
+        return await self._run(self._revoke_role_user, request)
+
+    async def ProvideRoleUsers(self, request, context):
+        return await self._run(self._change_role_users, request, provide_role_users)
+
+    async def RevokeRoleUsers(self, request, context):
+        return await self._run(self._change_role_users, request, revoke_role_users)
+
+    async def _run(self, func, request, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, request, *args)
+
+    def _get_user_info(self, request):
         with self.session() as db:
             user = self._get_item_by_id(db, self.user_m, request.id)
             return roles_control_pb2.UserInfo(email=user.email)
-    
-    def CreateRole(self, request, context):
+
+    def _create_role(self, request):
         with self.session() as db:
             role = self.role_m(name=request.name)
             db.add(role)
             db.commit()
             return roles_control_pb2.Uuid(id=str(role.id))
-    
-    def UpdateRole(self, request, context):
+
+    def _update_role(self, request):
         with self.session() as db:
             role = self._get_item_by_id(db, self.role_m, request.role_id)
             if role is None:
-                return roles_control_pb2.OperationResult(successful=False)    
+                return roles_control_pb2.OperationResult(successful=False)
             role.name = request.name
             db.add(role)
             db.commit()
+            self.user_cache.invalidate(get_role_user_ids(db, role.id))
             return roles_control_pb2.OperationResult(successful=True)
 
-    def ProvideRoleUser(self, request, context):
+    def _provide_role_user(self, request):
         with self.session() as db:
             user = self._get_item_by_id(db, self.user_m, request.user_id)
             if user is None:
-                return roles_control_pb2.OperationResult(successful=False) 
+                return roles_control_pb2.OperationResult(successful=False)
             role = self._get_item_by_id(db, self.role_m, request.role_id)
             if role is None:
                 return roles_control_pb2.OperationResult(successful=False)
             user.roles.append(role)
             db.add(user)
             db.commit()
+            self.user_cache.invalidate([user.id])
             self.storage.set_token_to_compromised(request.jti_to_compromised)
             return roles_control_pb2.OperationResult(successful=True)
 
-    def RevokeRoleUser(self, request, context):
+    def _revoke_role_user(self, request):
         with self.session() as db:
             user = self._get_item_by_id(db, self.user_m, request.user_id)
             if user is None:
-                return roles_control_pb2.OperationResult(successful=False) 
+                return roles_control_pb2.OperationResult(successful=False)
             role = self._get_item_by_id(db, self.role_m, request.role_id)
             if role is None:
                 return roles_control_pb2.OperationResult(successful=False)
             user.roles.remove(role)
             db.commit()
+            self.user_cache.invalidate([user.id])
             self.storage.set_token_to_compromised(request.jti_to_compromised)
             return roles_control_pb2.OperationResult(successful=True)
 
+    def _change_role_users(self, request, change_role):
+        if len(request.user_ids) > BULK_MAX_USERS:
+            return roles_control_pb2.BulkOperationResult(successful=False)
+        try:
+            user_ids = [uuid.UUID(user_id) for user_id in request.user_ids]
+        except ValueError:
+            return roles_control_pb2.BulkOperationResult(successful=False)
+        with self.session() as db:
+            role = self._get_item_by_id(db, self.role_m, request.role_id)
+            if role is None:
+                return roles_control_pb2.BulkOperationResult(successful=False)
+            affected = change_role(db, role.id, user_ids)
+        self.user_cache.invalidate(affected)
+        revoke_users_access_tokens(self.storage, affected)
+        return roles_control_pb2.BulkOperationResult(successful=True, affected=len(affected))
+
     def _get_item_by_id(self, db, model, id):
         id_query = uuid.UUID(id)
         return db.query(model).filter(model.id == id_query).first()
-        
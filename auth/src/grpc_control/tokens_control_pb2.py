@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: tokens_control.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14tokens_control.proto\x12\rtokenscontrol\"$\n\x08TokenIds\x12\x0b\n\x03jti\x18\x01 \x03(\t\x12\x0b\n\x03\x65xp\x18\x02 \x03(\x03\"\'\n\rTokenStatuses\x12\x16\n\x0eis_compromised\x18\x01 \x03(\x08\"%\n\x0cWatchRequest\x12\x15\n\rwith_snapshot\x18\x01 \x01(\x08\">\n\x0cRevokedToken\x12\x0b\n\x03jti\x18\x01 \x01(\t\x12\x0b\n\x03\x65xp\x18\x02 \x01(\x03\x12\x14\n\x0csnapshot_end\x18\x03 \x01(\x08\x32\xa9\x01\n\rTokensControl\x12\x46\n\x0b\x43heckTokens\x12\x17.tokenscontrol.TokenIds\x1a\x1c.tokenscontrol.TokenStatuses\"\x00\x12P\n\x10WatchRevocations\x12\x1b.tokenscontrol.WatchRequest\x1a\x1b.tokenscontrol.RevokedToken\"\x00\x30\x01\x62\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'tokens_control_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _TOKENIDS._serialized_start=39
+  _TOKENIDS._serialized_end=75
+  _TOKENSTATUSES._serialized_start=77
+  _TOKENSTATUSES._serialized_end=116
+  _WATCHREQUEST._serialized_start=118
+  _WATCHREQUEST._serialized_end=155
+  _REVOKEDTOKEN._serialized_start=157
+  _REVOKEDTOKEN._serialized_end=219
+  _TOKENSCONTROL._serialized_start=222
+  _TOKENSCONTROL._serialized_end=391
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,36 @@
+from google.protobuf.internal import containers as _containers
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from typing import ClassVar as _ClassVar, Iterable as _Iterable, Optional as _Optional
+
+DESCRIPTOR: _descriptor.FileDescriptor
+
+class RevokedToken(_message.Message):
+    __slots__ = ["exp", "jti", "snapshot_end"]
+    EXP_FIELD_NUMBER: _ClassVar[int]
+    JTI_FIELD_NUMBER: _ClassVar[int]
+    SNAPSHOT_END_FIELD_NUMBER: _ClassVar[int]
+    exp: int
+    jti: str
+    snapshot_end: bool
+    def __init__(self, jti: _Optional[str] = ..., exp: _Optional[int] = ..., snapshot_end: bool = ...) -> None: ...
+
+class TokenIds(_message.Message):
+    __slots__ = ["exp", "jti"]
+    EXP_FIELD_NUMBER: _ClassVar[int]
+    JTI_FIELD_NUMBER: _ClassVar[int]
+    exp: _containers.RepeatedScalarFieldContainer[int]
+    jti: _containers.RepeatedScalarFieldContainer[str]
+    def __init__(self, jti: _Optional[_Iterable[str]] = ..., exp: _Optional[_Iterable[int]] = ...) -> None: ...
+
+class TokenStatuses(_message.Message):
+    __slots__ = ["is_compromised"]
+    IS_COMPROMISED_FIELD_NUMBER: _ClassVar[int]
+    is_compromised: _containers.RepeatedScalarFieldContainer[bool]
+    def __init__(self, is_compromised: _Optional[_Iterable[bool]] = ...) -> None: ...
+
+class WatchRequest(_message.Message):
+    __slots__ = ["with_snapshot"]
+    WITH_SNAPSHOT_FIELD_NUMBER: _ClassVar[int]
+    with_snapshot: bool
+    def __init__(self, with_snapshot: bool = ...) -> None: ...
@@ -0,0 +1,99 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from grpc_control import tokens_control_pb2 as tokens__control__pb2
+
+
+class TokensControlStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.CheckTokens = channel.unary_unary(
+                '/tokenscontrol.TokensControl/CheckTokens',
+                request_serializer=tokens__control__pb2.TokenIds.SerializeToString,
+                response_deserializer=tokens__control__pb2.TokenStatuses.FromString,
+                )
+        self.WatchRevocations = channel.unary_stream(
+                '/tokenscontrol.TokensControl/WatchRevocations',
+                request_serializer=tokens__control__pb2.WatchRequest.SerializeToString,
+                response_deserializer=tokens__control__pb2.RevokedToken.FromString,
+                )
+
+
+class TokensControlServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def CheckTokens(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchRevocations(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_TokensControlServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'CheckTokens': grpc.unary_unary_rpc_method_handler(
+                    servicer.CheckTokens,
+                    request_deserializer=tokens__control__pb2.TokenIds.FromString,
+                    response_serializer=tokens__control__pb2.TokenStatuses.SerializeToString,
+            ),
+            'WatchRevocations': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchRevocations,
+                    request_deserializer=tokens__control__pb2.WatchRequest.FromString,
+                    response_serializer=tokens__control__pb2.RevokedToken.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'tokenscontrol.TokensControl', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class TokensControl(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def CheckTokens(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/tokenscontrol.TokensControl/CheckTokens',
+            tokens__control__pb2.TokenIds.SerializeToString,
+            tokens__control__pb2.TokenStatuses.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def WatchRevocations(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/tokenscontrol.TokensControl/WatchRevocations',
+            tokens__control__pb2.WatchRequest.SerializeToString,
+            tokens__control__pb2.RevokedToken.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -0,0 +1,55 @@
+import asyncio
+import json
+import logging
+
+import grpc
+
+from grpc_control import tokens_control_pb2, tokens_control_pb2_grpc
+from storage_token import get_storage_tokens
+
+
+# how often the stream checks that the client is still connected
+WATCH_POLL_TIMEOUT = 1.0
+
+
+class TokensControl(tokens_control_pb2_grpc.TokensControlServicer):
+    """
+    The servicer of the grpc.aio server.
+
+    The Redis client is blocking, so the calls run in the default executor of the loop: the streams do not take the
+    threads of the database executor.
+    """
+    def __init__(self):
+        self.storage = get_storage_tokens()
+
+    async def CheckTokens(self, request, context):
+        if len(request.exp) != len(request.jti):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'exp must be set for every jti')
+        is_compromised = await self._run(self.storage.check_tokens_are_compromised, list(request.jti),
+                                         list(request.exp))
+        return tokens_control_pb2.TokenStatuses(is_compromised=is_compromised)
+
+    async def WatchRevocations(self, request, context):
+        # subscribe before the snapshot is read, so no revocation between them is lost
+        pubsub = await self._run(self.storage.subscribe_to_compromised_tokens)
+        try:
+            if request.with_snapshot:
+                compromised_tokens = await self._run(lambda: list(self.storage.get_compromised_tokens()))
+                for jti, exp in compromised_tokens:
+                    yield tokens_control_pb2.RevokedToken(jti=jti, exp=exp)
+                yield tokens_control_pb2.RevokedToken(snapshot_end=True)
+            # the generator is cancelled when the client disconnects
+            while True:
+                message = await self._run(pubsub.get_message, False, WATCH_POLL_TIMEOUT)
+                if message is None:
+                    continue
+                try:
+                    data = json.loads(message['data'])
+                    yield tokens_control_pb2.RevokedToken(jti=data['jti'], exp=data['exp'])
+                except (ValueError, KeyError, TypeError):
+                    logging.warning('Wrong revoked token message: %s', message['data'])
+        finally:
+            pubsub.close()
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
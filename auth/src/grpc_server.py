@@ -1,22 +1,36 @@
-import grpc
-import uuid
+import asyncio
 import logging
 from concurrent import futures
 
-from grpc_control import roles_control_pb2_grpc
+from grpc import aio
+
+from grpc_control import roles_control_pb2_grpc, tokens_control_pb2_grpc
 from grpc_control.roles_control_server import RolesControl
+from grpc_control.tokens_control_server import TokensControl
 from settings import api_settings as _as
 
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+# the time given to the running calls to finish on shutdown
+SHUTDOWN_GRACE = 5
+
+
+async def serve():
+    # the blocking database calls run in the threads, the server itself runs in the event loop
+    executor = futures.ThreadPoolExecutor(max_workers=_as.grpc_max_workers)
+    server = aio.server()
     roles_control_pb2_grpc.add_RolesControlServicer_to_server(
-        RolesControl(), server)
+        RolesControl(executor), server)
+    tokens_control_pb2_grpc.add_TokensControlServicer_to_server(
+        TokensControl(), server)
     server.add_insecure_port(f'[::]:{_as.grpc_port}')
-    server.start()
-    server.wait_for_termination()
+    await server.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(SHUTDOWN_GRACE)
+        executor.shutdown()
 
 
 if __name__ == '__main__':
     logging.basicConfig()
-    serve()
\ No newline at end of file
+    asyncio.run(serve())
@@ -4,10 +4,14 @@ ERR_EMPTY_VALUE = '{} must not be empty!'
 
 ERR_USER_NOT_FOUND = 'User not found'
 ERR_WRONG_PASSWORD = 'Password is wrong'
+ERR_PASSWORD_HASHING_BUSY = 'The service is overloaded, please try again later'
 
 ERR_USER_ROLE_NOT_FOUND = 'Role not found'
 ROLE_PROVIDED = 'Role successfully provided'
 ROLE_REVOKED = 'Role successfully revoked'
+ROLES_PROVIDED = 'Role successfully provided to {} users'
+ROLES_REVOKED = 'Role successfully revoked from {} users'
+ERR_TOO_MANY_USERS = 'No more than {} users can be changed at once'
 ERR_USER_ROLE_VALUE_ERROR = 'A ValueError has occurred. The user may not have a specified role.''A ValueError has occurred. The user may not have a specified role.'
 
 ERR_REFRESH_TOKEN_NOT_EXIST = 'refresh token does not exist'
@@ -19,6 +23,7 @@ DELETED = 'Deleted'
 MODIFIED = 'Modified'
 
 TOKENS_REVOKED = 'Access and refresh tokens has been revoked'
+ALL_TOKENS_REVOKED = 'Access and refresh tokens of all sessions has been revoked'
 PASSWORD_CHANGED = 'Password was changed successfully!'
 
 NOT_RESOURCE = 'The resource Oauth can not be found'
@@ -0,0 +1,27 @@
+"""Drop the user salt, the bcrypt hash keeps it.
+
+Revision ID: 4f6c2a8d1e37
+Revises: 99b819b61d2e
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '4f6c2a8d1e37'
+down_revision = '99b819b61d2e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_column('user', 'salt')
+
+
+def downgrade():
+    op.add_column('user', sa.Column('salt', postgresql.BYTEA(), nullable=True))
+    # the salt is the first 29 bytes of the hash: '$2b$<cost>$' and 22 characters of the encoded salt
+    op.execute('UPDATE "user" SET salt = substring(password from 1 for 29)')
+    op.alter_column('user', 'salt', nullable=False)
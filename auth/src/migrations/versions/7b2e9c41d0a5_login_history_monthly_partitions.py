@@ -0,0 +1,52 @@
+"""Partition the login history of every device type by month.
+
+Revision ID: 7b2e9c41d0a5
+Revises: 4f6c2a8d1e37
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '7b2e9c41d0a5'
+down_revision = '4f6c2a8d1e37'
+branch_labels = None
+depends_on = None
+
+DEVICE_TYPES = ('ps', 'mobile', 'other')
+COLUMNS = 'id, date, user_id, user_agent, user_device_type'
+
+
+def upgrade():
+    for device_type in DEVICE_TYPES:
+        op.execute(f'ALTER TABLE "login_history" DETACH PARTITION "login_history_{device_type}"')
+        op.execute(f'ALTER TABLE "login_history_{device_type}" RENAME TO "login_history_{device_type}_old"')
+    # the primary key of a partitioned table includes the partition keys of all levels
+    op.drop_constraint('login_history_id_user_device_type_key', 'login_history', type_='unique')
+    op.drop_constraint('login_history_pkey', 'login_history', type_='primary')
+    op.create_primary_key('login_history_pkey', 'login_history', ['id', 'date', 'user_device_type'])
+    op.execute('CREATE INDEX "ix_login_history_user_id_date" ON "login_history" (user_id, date DESC)')
+    for device_type in DEVICE_TYPES:
+        op.execute(f"""CREATE TABLE "login_history_{device_type}" PARTITION OF "login_history" """
+                   f"""FOR VALUES IN ('{device_type}') PARTITION BY RANGE (date)""")
+        op.execute(f'CREATE TABLE "login_history_{device_type}_default" '
+                   f'PARTITION OF "login_history_{device_type}" DEFAULT')
+        # the rows go to the default partition, flask history create-partitions moves them to the months partitions
+        op.execute(f'INSERT INTO "login_history" ({COLUMNS}) SELECT {COLUMNS} FROM "login_history_{device_type}_old"')
+        op.execute(f'DROP TABLE "login_history_{device_type}_old"')
+
+
+def downgrade():
+    for device_type in DEVICE_TYPES:
+        op.execute(f'ALTER TABLE "login_history" DETACH PARTITION "login_history_{device_type}"')
+        op.execute(f'ALTER TABLE "login_history_{device_type}" RENAME TO "login_history_{device_type}_old"')
+    op.execute('DROP INDEX "ix_login_history_user_id_date"')
+    op.drop_constraint('login_history_pkey', 'login_history', type_='primary')
+    op.create_primary_key('login_history_pkey', 'login_history', ['id', 'user_device_type'])
+    op.create_unique_constraint('login_history_id_user_device_type_key', 'login_history', ['id', 'user_device_type'])
+    for device_type in DEVICE_TYPES:
+        op.execute(f"""CREATE TABLE "login_history_{device_type}" PARTITION OF "login_history" """
+                   f"""FOR VALUES IN ('{device_type}')""")
+        op.execute(f'INSERT INTO "login_history" ({COLUMNS}) SELECT {COLUMNS} FROM "login_history_{device_type}_old"')
+        # the months partitions are dropped with their parent
+        op.execute(f'DROP TABLE "login_history_{device_type}_old"')
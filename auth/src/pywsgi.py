@@ -5,8 +5,16 @@ monkey.patch_all()
 from gevent.pywsgi import WSGIServer
 
 from app import app
+from revocation_filter import get_revocation_filter
+from services.login_history_partitions import start_partition_maintenance
+from services.login_history_writer import get_login_history_writer
 from settings import api_settings
 
+if api_settings.revocation_filter_enabled:
+    get_revocation_filter().start()
+get_login_history_writer().start(app)
+start_partition_maintenance(app)
+
 
 http_server = WSGIServer(('', api_settings.flask_port), app)
 http_server.serve_forever()
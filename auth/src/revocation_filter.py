@@ -0,0 +1,81 @@
+import json
+import logging
+import threading
+import time
+
+from settings import api_settings as _as
+from storage_token import StorageTokens, get_storage_tokens
+from utils.bloom_filter import BloomFilter
+
+
+logger = logging.getLogger(__name__)
+
+# how often the listener checks whether the filter must be rebuilt
+POLL_TIMEOUT = 1.0
+
+
+class RevocationFilter:
+    """
+    In-process Bloom filter of the compromised tokens.
+
+    A token which is not in the filter is not compromised, so most checks are answered without Redis. The filter
+    is loaded from the revoked tokens buckets after subscribing to the revoked tokens channel and then is filled
+    from the channel. The expired tokens can not be removed from the filter, so it is rebuilt every rebuild
+    interval. While the filter is not loaded, every token might be compromised and is checked in Redis.
+    """
+    def __init__(self, storage: StorageTokens, capacity: int, error_rate: float, rebuild_interval: int):
+        self.storage = storage
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self.is_synced = False
+        self._filter: BloomFilter | None = None
+        self._thread: threading.Thread | None = None
+
+    def might_contain(self, jti: str) -> bool:
+        if not self.is_synced:
+            return True
+        return jti in self._filter
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='revocation-filter', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.exception('Revocation filter listener failed')
+            finally:
+                self.is_synced = False
+            time.sleep(POLL_TIMEOUT)
+
+    def _listen(self) -> None:
+        # subscribe before the snapshot is read, so no revocation between them is lost
+        pubsub = self.storage.subscribe_to_compromised_tokens()
+        try:
+            bloom_filter = BloomFilter(self.capacity, self.error_rate)
+            for jti, _ in self.storage.get_compromised_tokens():
+                bloom_filter.add(jti)
+            self._filter = bloom_filter
+            self.is_synced = True
+            rebuild_at = time.monotonic() + self.rebuild_interval
+            while time.monotonic() < rebuild_at:
+                message = pubsub.get_message(timeout=POLL_TIMEOUT)
+                if message is None:
+                    continue
+                try:
+                    bloom_filter.add(json.loads(message['data'])['jti'])
+                except (ValueError, KeyError, TypeError):
+                    logger.warning('Wrong revoked token message: %s', message['data'])
+        finally:
+            pubsub.close()
+
+
+revocation_filter = RevocationFilter(get_storage_tokens(), _as.revocation_filter_capacity,
+                                     _as.revocation_filter_error_rate, _as.revocation_filter_rebuild_interval)
+
+
+def get_revocation_filter() -> RevocationFilter:
+    return revocation_filter
@@ -10,3 +10,18 @@ class BearerAuthSchema(ma.Schema):
 
 class IsTokenCompromisedSchema(ma.Schema):
     is_compromised = fields.Boolean(required=True)
+
+
+class LatencySchema(ma.Schema):
+    p50 = fields.Float(required=True)
+    p99 = fields.Float(required=True)
+    max = fields.Float(required=True)
+
+
+class PasswordHashingStatsSchema(ma.Schema):
+    hashed = fields.Int(required=True, description="количество выполненных хеширований")
+    rejected = fields.Int(required=True, description="количество отклоненных из-за переполнения очереди вызовов")
+    in_progress = fields.Int(required=True, description="количество хеширований, выполняемых сейчас")
+    queue_depth = fields.Int(required=True, description="количество вызовов в очереди")
+    wait_ms = fields.Nested(LatencySchema, description="время ожидания в очереди")
+    hash_ms = fields.Nested(LatencySchema, description="время хеширования")
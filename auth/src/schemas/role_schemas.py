@@ -32,6 +32,14 @@ class UserProvideRoleSchema(ma.Schema):
 user_provide_role_schema = UserProvideRoleSchema()
 
 
+class UserBulkProvideRoleSchema(ma.Schema):
+    role_id = fields.UUID(description="id роли", required=True)
+    user_ids = fields.List(fields.UUID(), description="список id пользователей", required=True)
+
+
+user_bulk_provide_role_schema = UserBulkProvideRoleSchema()
+
+
 class QueryUserIdSchema(ma.Schema):
     user_id = fields.UUID(required=False, example="xxxxxxxx-xxxx-Mxxx-Nxxx-xxxxxxxxxxxx")
 
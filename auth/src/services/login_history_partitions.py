@@ -0,0 +1,136 @@
+import logging
+from datetime import date, datetime
+
+import gevent
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from database.db import db
+from database.db_models import UserDeviceType
+from settings import api_settings as _as
+
+
+logger = logging.getLogger(__name__)
+
+# login_history is partitioned by the device type, every device type partition is partitioned by month:
+# login_history_<device type>_y<year>m<month> and the default partition login_history_<device type>_default
+# for the rows of the months which have no partition yet
+DEVICE_TABLE = 'login_history_{}'
+MONTH_TABLE = 'login_history_{}_y{:04d}m{:02d}'
+DEFAULT_TABLE = 'login_history_{}_default'
+DEVICE_TYPES = [str(device_type) for device_type in UserDeviceType]
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_month(day: date | datetime) -> date:
+    return date(day.year, day.month, 1)
+
+
+def create_month_partition(connection: Connection, device_type: str, month: date) -> bool:
+    """
+    Create the partition of the month if it does not exist.
+
+    The rows of the month are moved from the default partition, otherwise the partition could not be attached.
+    :return: True if the partition was created.
+    """
+    device_table = DEVICE_TABLE.format(device_type)
+    month_table = MONTH_TABLE.format(device_type, month.year, month.month)
+    if connection.execute(text('SELECT to_regclass(:name)'), {'name': month_table}).scalar() is not None:
+        return False
+    bounds = {'start': month, 'end': add_months(month, 1)}
+    connection.execute(text(f'CREATE TABLE "{month_table}" (LIKE "{device_table}" INCLUDING DEFAULTS)'))
+    connection.execute(text(f'''
+        WITH moved AS (
+            DELETE FROM "{DEFAULT_TABLE.format(device_type)}" WHERE date >= :start AND date < :end RETURNING *
+        )
+        INSERT INTO "{month_table}" SELECT * FROM moved
+    '''), bounds)
+    connection.execute(text(f'''
+        ALTER TABLE "{device_table}" ATTACH PARTITION "{month_table}"
+        FOR VALUES FROM ('{bounds["start"]}') TO ('{bounds["end"]}')
+    '''))
+    return True
+
+
+def create_partitions(connection: Connection, months_ahead: int, today: date | None = None) -> list[str]:
+    """
+    Create the partitions from the current month to months_ahead months later.
+
+    The partitions are created for the months of the rows in the default partitions too (e.g. the rows copied
+    by the migration).
+    :return: the names of the created partitions.
+    """
+    current = get_month(today or datetime.utcnow())
+    created = []
+    for device_type in DEVICE_TYPES:
+        months = {add_months(current, n) for n in range(months_ahead + 1)}
+        default_months = connection.execute(text(
+            f'SELECT DISTINCT date_trunc(\'month\', date) FROM "{DEFAULT_TABLE.format(device_type)}"'
+        )).scalars()
+        months.update(get_month(month) for month in default_months)
+        for month in sorted(months):
+            if create_month_partition(connection, device_type, month):
+                created.append(MONTH_TABLE.format(device_type, month.year, month.month))
+    return created
+
+
+def drop_partitions(connection: Connection, keep_months: int, detach_only: bool = False,
+                    today: date | None = None) -> list[str]:
+    """
+    Detach and drop the partitions of the months older than keep_months months before the current one.
+
+    The old rows of the default partitions are deleted too.
+    :param detach_only: keep the detached tables (e.g. to archive them).
+    :return: the names of the detached partitions.
+    """
+    cutoff = add_months(get_month(today or datetime.utcnow()), -keep_months)
+    detached = []
+    for device_type in DEVICE_TYPES:
+        device_table = DEVICE_TABLE.format(device_type)
+        partitions = connection.execute(text('''
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :parent
+        '''), {'parent': device_table}).scalars().all()
+        for partition in partitions:
+            prefix = f'{device_table}_y'
+            if not partition.startswith(prefix):
+                continue
+            year, month = partition[len(prefix):].split('m')
+            if add_months(date(int(year), int(month), 1), 1) > cutoff:
+                continue
+            connection.execute(text(f'ALTER TABLE "{device_table}" DETACH PARTITION "{partition}"'))
+            if not detach_only:
+                connection.execute(text(f'DROP TABLE "{partition}"'))
+            detached.append(partition)
+        connection.execute(text(f'DELETE FROM "{DEFAULT_TABLE.format(device_type)}" WHERE date < :cutoff'),
+                           {'cutoff': cutoff})
+    return detached
+
+
+def maintain_partitions() -> None:
+    """Create the future partitions and drop the expired ones (in the application context)."""
+    with db.engine.begin() as connection:
+        created = create_partitions(connection, _as.login_history_months_ahead)
+        dropped = drop_partitions(connection, _as.login_history_retention_months)
+    if created or dropped:
+        logger.info('Login history partitions created: %s, dropped: %s', created, dropped)
+
+
+def start_partition_maintenance(app: Flask) -> None:
+    """Run maintain_partitions every maintenance interval in the background greenlet."""
+    def run() -> None:
+        while True:
+            try:
+                with app.app_context():
+                    maintain_partitions()
+            except Exception:
+                logger.exception('Login history partition maintenance failed')
+            gevent.sleep(_as.login_history_maintenance_interval)
+    gevent.spawn(run)
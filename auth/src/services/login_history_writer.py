@@ -0,0 +1,106 @@
+import atexit
+import logging
+import uuid
+from collections import deque
+from datetime import datetime
+from uuid import UUID
+
+import gevent
+from flask import Flask
+from gevent.event import Event
+from gevent.lock import Semaphore
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from database.db import db
+from database.db_models import LoginHistory, User, UserDeviceType
+from settings import api_settings as _as
+
+
+logger = logging.getLogger(__name__)
+
+
+class LoginHistoryWriter:
+    """
+    Buffers the login history rows and writes them to Postgres in batches.
+
+    The logins only append a row to the in-process buffer. The writer greenlet inserts the buffered rows with one
+    multi-row INSERT when the batch is full or every flush interval. The history readers call flush first,
+    so they see the logins of this process. Until the writer is started (e.g. in the CLI) every row is written
+    at once. The rows which are not written yet are lost if the process is killed.
+    """
+    def __init__(self, batch_size: int, flush_interval: float, max_buffer: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: deque[dict] = deque(maxlen=max_buffer)
+        self._batch_ready = Event()
+        # one flush at a time, so a reader waits for the rows being written by the writer
+        self._flush_lock = Semaphore()
+        self._app: Flask | None = None
+
+    def add(self, user_id: UUID, user_agent: str | None, device_type: UserDeviceType) -> None:
+        """Remember the login, the date is the time of the call."""
+        if len(self._buffer) == self._buffer.maxlen:
+            logger.warning('Login history buffer is full, the oldest login is dropped')
+        self._buffer.append({'id': uuid.uuid4(), 'date': datetime.utcnow(), 'user_id': user_id,
+                             'user_agent': user_agent, 'user_device_type': str(device_type)})
+        if self._app is None:
+            self.flush()
+        elif len(self._buffer) >= self.batch_size:
+            self._batch_ready.set()
+
+    def flush(self) -> None:
+        """Write all buffered rows (in the application context)."""
+        with self._flush_lock:
+            while self._buffer:
+                rows = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                try:
+                    self._write(rows)
+                except Exception:
+                    # the rows are written with the next flush, they are older than the rows added during the write,
+                    # so the oldest of them are dropped if the buffer is full
+                    free = self._buffer.maxlen - len(self._buffer)
+                    if free < len(rows):
+                        logger.warning('Login history buffer is full, %s oldest logins are dropped', len(rows) - free)
+                        rows = rows[len(rows) - free:]
+                    self._buffer.extendleft(reversed(rows))
+                    raise
+
+    def start(self, app: Flask) -> None:
+        self._app = app
+        gevent.spawn(self._run)
+        atexit.register(self._flush_in_app)
+
+    def _run(self) -> None:
+        while True:
+            self._batch_ready.wait(self.flush_interval)
+            self._batch_ready.clear()
+            try:
+                self._flush_in_app()
+            except Exception:
+                logger.exception('Login history writer failed')
+
+    def _flush_in_app(self) -> None:
+        with self._app.app_context():
+            self.flush()
+
+    def _write(self, rows: list[dict]) -> None:
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(LoginHistory.__table__), rows)
+        except IntegrityError:
+            # a user was deleted after the login, the rows of the existing users are written
+            with db.engine.begin() as connection:
+                user_ids = {row['user_id'] for row in rows}
+                existing = set(connection.execute(select(User.id).where(User.id.in_(user_ids))).scalars())
+                rows = [row for row in rows if row['user_id'] in existing]
+                if rows:
+                    connection.execute(insert(LoginHistory.__table__), rows)
+
+
+login_history_writer = LoginHistoryWriter(_as.login_history_batch_size, _as.login_history_flush_interval,
+                                          _as.login_history_max_buffer)
+
+
+def get_login_history_writer() -> LoginHistoryWriter:
+    return login_history_writer
@@ -7,9 +7,10 @@ from urllib.parse import urlencode
 
 import messages
 from database.db import db
-from database.db_models import User, LoginHistory, ResourceOauth, UserDeviceType
+from database.db_models import User, ResourceOauth, UserDeviceType
+from services.login_history_writer import LoginHistoryWriter, get_login_history_writer
 from storage_token import get_storage_tokens
-from tokens import TokenType, generate_token
+from tokens import generate_session_tokens
 from settings import api_settings
 from storage_token import StorageTokens, get_storage_tokens
 
@@ -23,9 +24,10 @@ class OauthLoginService:
     to add a new resource, describe map _url_request_map and _resource_login_map
     and specify the implementation method
     """
-    def __init__(self, storage: StorageTokens, session):
+    def __init__(self, storage: StorageTokens, session, login_history_writer: LoginHistoryWriter):
         self.storage = storage
-        self.session = session    
+        self.session = session
+        self.login_history_writer = login_history_writer
 
     def get_client_id(self, name_resource: str):
         """return client_id and url_request for resource."""
@@ -146,17 +148,12 @@ class OauthLoginService:
             user = User(**data)
             self.session.add(user)
             self.session.commit()
-        access_token = generate_token(user, TokenType.access_token)
-        refresh_token = generate_token(user, TokenType.refresh_token)
+        access_token, refresh_token = generate_session_tokens(user)
         # add tokens to storage
         self.storage.save_access_refresh_tokens(user.id, access_token, refresh_token)
         # add history
-        data = {'user_id': user.id,
-                'user_agent': f'login via authorization OAuth2.0 resource {name_resource}',
-                'user_device_type': str(UserDeviceType.OTHER),}
-        log = LoginHistory(**data)
-        db.session.add(log)
-        db.session.commit()
+        self.login_history_writer.add(user.id, f'login via authorization OAuth2.0 resource {name_resource}',
+                                      UserDeviceType.OTHER)
         return {'access_token': access_token, 'refresh_token': refresh_token}
 
     def _get_client(self, name_resource: str) -> tuple | None:
@@ -166,7 +163,7 @@ class OauthLoginService:
         return resource.client_id, resource.client_secret
 
 
-oauth_login_service = OauthLoginService(get_storage_tokens(),db.session)
+oauth_login_service = OauthLoginService(get_storage_tokens(), db.session, get_login_history_writer())
 
 
 def get_oauth_login_service() -> OauthLoginService:
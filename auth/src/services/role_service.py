@@ -0,0 +1,61 @@
+from uuid import UUID
+
+from sqlalchemy import delete, literal, select
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from database.db_models import User, users_user_roles
+from storage_token import StorageTokens
+
+
+# the maximum number of users in one bulk request
+BULK_MAX_USERS = 100000
+
+
+def provide_role_users(session: Session, role_id: UUID, user_ids: list[UUID]) -> list[UUID]:
+    """
+    Provide the role to the users with one INSERT ... ON CONFLICT DO NOTHING.
+
+    The unknown users and the users who already have the role are skipped.
+    :return: the users who got the role.
+    """
+    users = select(User.id, literal(role_id, PG_UUID(as_uuid=True))).where(User.id.in_(user_ids))
+    query = (insert(users_user_roles)
+             .from_select(['user_id', 'role_id'], users)
+             .on_conflict_do_nothing()
+             .returning(users_user_roles.c.user_id))
+    affected = session.execute(query).scalars().all()
+    session.commit()
+    return affected
+
+
+def revoke_role_users(session: Session, role_id: UUID, user_ids: list[UUID]) -> list[UUID]:
+    """
+    Revoke the role from the users with one DELETE.
+
+    :return: the users who had the role.
+    """
+    query = (delete(users_user_roles)
+             .where(users_user_roles.c.role_id == role_id, users_user_roles.c.user_id.in_(user_ids))
+             .returning(users_user_roles.c.user_id))
+    affected = session.execute(query).scalars().all()
+    session.commit()
+    return affected
+
+
+def get_role_user_ids(session: Session, role_id: UUID) -> list[UUID]:
+    """The users who have the role, without loading them."""
+    query = select(users_user_roles.c.user_id).where(users_user_roles.c.role_id == role_id)
+    return session.execute(query).scalars().all()
+
+
+def revoke_users_access_tokens(storage: StorageTokens, user_ids: list[UUID]) -> None:
+    """
+    Set the access tokens of all sessions of the users to compromised: their roles claim is out of date.
+
+    The tokens are loaded with one pipeline and revoked with another one.
+    """
+    tokens = storage.get_sessions_access_tokens(user_ids)
+    if tokens:
+        storage.set_tokens_to_compromised(tokens)
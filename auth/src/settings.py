@@ -25,6 +25,40 @@ class Settings(BaseSettings):
     yandex_base_url: str = 'https://oauth.yandex.ru/'
     vk_base_url = 'https://oauth.vk.com/'
     grpc_port: int = 50051
+    # the threads running the blocking database calls of the gRPC server
+    grpc_max_workers: int = 16
+    # the connection pool of the gRPC server, every worker thread should get a connection
+    grpc_db_pool_size: int = 16
+    grpc_db_max_overflow: int = 4
+    grpc_db_pool_timeout: int = 10
+    grpc_db_pool_recycle: int = 1800
+    grpc_db_pool_pre_ping: bool = True
+    revoked_tokens_channel: str = 'revoked_tokens'
+    # the in-process Bloom filter of the compromised tokens in front of Redis
+    revocation_filter_enabled: bool = False
+    revocation_filter_capacity: int = 1000000
+    revocation_filter_error_rate: float = 0.001
+    revocation_filter_rebuild_interval: int = 3600
+    # the cache of the users checked by the authorization decorator, the local copies are not invalidated
+    # in the other workers, so their TTL is short
+    user_cache_ttl: int = 300
+    user_cache_local_ttl: float = 5
+    user_cache_local_max_items: int = 10000
+    # the threads hashing the passwords and the number of the calls waiting for them,
+    # the calls over the limit are answered with 503
+    password_hashing_workers: int = 4
+    password_hashing_queue_size: int = 16
+    password_hashing_retry_after: int = 1
+    # the bcrypt cost of the new hashes, the older hashes are upgraded at login (see benchmarks.bcrypt_cost)
+    password_hashing_rounds: int = 12
+    # the login history rows are inserted in batches by the background writer
+    login_history_batch_size: int = 500
+    login_history_flush_interval: float = 1
+    login_history_max_buffer: int = 100000
+    # the login history is partitioned by month, the partitions are created ahead and dropped after the retention
+    login_history_months_ahead: int = 3
+    login_history_retention_months: int = 12
+    login_history_maintenance_interval: int = 24 * 60 * 60
 
 
 api_settings = Settings()
@@ -1,51 +1,290 @@
+import json
+import time
+from typing import Iterator
 from uuid import UUID
 
+import jwt
 from database.db import redis_db
 from redis import Redis
+from redis.client import Pipeline
 from settings import api_settings as _as
 
 
+# the session keys of the user: session id -> refresh token jti, session id -> '<access token jti>:<exp>',
+# the sorted set of the session ids by their expiration time
+SESSION_KEYS = ('sessions_{}', 'sessionsAccess_{}', 'sessionsExpire_{}')
+
+# the compromised tokens are kept in sets, one set per hour of the token expiration time,
+# the set expires with the last token in it
+REVOKED_BUCKET_PREFIX = 'jtiBlock:'
+REVOKED_BUCKET_SECONDS = 3600
+# the compromised tokens were kept in the keys 'jtiBlock_<jti>' expiring with the token before the buckets
+LEGACY_REVOKED_PREFIX = 'jtiBlock_'
+# the legacy keys moved with one round trip
+MIGRATE_CHUNK_SIZE = 1000
+
+# ARGV[1]: the revoked tokens channel
+BLOCK_FUNCTION = """
+local function block(jti, exp)
+    exp = tonumber(exp)
+    local bucket = math.floor(exp / 3600)
+    local key = 'jtiBlock:' .. bucket
+    redis.call('SADD', key, jti)
+    redis.call('EXPIREAT', key, (bucket + 1) * 3600)
+    redis.call('PUBLISH', ARGV[1], cjson.encode({jti = jti, exp = exp}))
+end
+
+local function block_session_access(value)
+    local jti, exp = string.match(value, '^(.+):(%d+)$')
+    if jti then
+        block(jti, exp)
+    end
+    return jti
+end
+"""
+
+# KEYS: the session keys. Hash fields can not expire, so the expired sessions are dropped on every login.
+PURGE_FUNCTION = """
+local function purge(now)
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now, 'LIMIT', 0, 1000)
+    if #expired > 0 then
+        redis.call('HDEL', KEYS[1], unpack(expired))
+        redis.call('HDEL', KEYS[2], unpack(expired))
+        redis.call('ZREM', KEYS[3], unpack(expired))
+    end
+end
+"""
+
+# ARGV: the session id, the refresh token jti, '<access token jti>:<exp>', the session expire timestamp, now
+SAVE_SESSION_SCRIPT = PURGE_FUNCTION + """
+purge(ARGV[5])
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+redis.call('ZADD', KEYS[3], ARGV[4], ARGV[1])
+-- the keys live as long as the latest session
+local latest = redis.call('ZRANGE', KEYS[3], -1, -1, 'WITHSCORES')
+for i = 1, 3 do
+    redis.call('EXPIREAT', KEYS[i], math.ceil(tonumber(latest[2])))
+end
+"""
+
+# ARGV: the session id, '<access token jti>:<exp>'
+UPDATE_SESSION_ACCESS_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+    redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# ARGV[2]: the session id, ARGV[3], ARGV[4]: the access token jti and exp of the request or ''
+REVOKE_SESSION_SCRIPT = BLOCK_FUNCTION + """
+local access = redis.call('HGET', KEYS[2], ARGV[2])
+local access_jti = access and block_session_access(access)
+if ARGV[3] ~= '' and ARGV[3] ~= access_jti then
+    block(ARGV[3], ARGV[4])
+end
+redis.call('HDEL', KEYS[1], ARGV[2])
+redis.call('HDEL', KEYS[2], ARGV[2])
+redis.call('ZREM', KEYS[3], ARGV[2])
+"""
+
+# ARGV[2], ARGV[3]: the access token jti and exp of the request or ''
+REVOKE_ALL_SESSIONS_SCRIPT = BLOCK_FUNCTION + """
+local current_blocked = false
+for _, access in ipairs(redis.call('HVALS', KEYS[2])) do
+    current_blocked = block_session_access(access) == ARGV[2] or current_blocked
+end
+if ARGV[2] ~= '' and not current_blocked then
+    block(ARGV[2], ARGV[3])
+end
+-- the session keys are freed in the background
+redis.call('UNLINK', KEYS[1], KEYS[2], KEYS[3])
+"""
+
+
 class StorageTokens():
-    """Saving and retrieving tokens in Redis database."""
+    """
+    Saving and retrieving tokens in Redis database.
+
+    Every user can have several sessions (devices), every login starts a new session. A refresh token is valid
+    while its session is stored. Every operation costs one round trip to Redis: the commands are sent
+    in a pipeline or run by a Lua script.
+    """
     def __init__(self, redis: Redis):
         self.redis = redis
+        self._save_session_script = redis.register_script(SAVE_SESSION_SCRIPT)
+        self._update_session_access_script = redis.register_script(UPDATE_SESSION_ACCESS_SCRIPT)
+        self._revoke_session_script = redis.register_script(REVOKE_SESSION_SCRIPT)
+        self._revoke_all_sessions_script = redis.register_script(REVOKE_ALL_SESSIONS_SCRIPT)
 
     def save_access_refresh_tokens(self, id: UUID, access_token: str,
                                    refresh_token: str) -> None:
+        """Start the session of the tokens (see tokens.generate_session_tokens)."""
+        refresh_payload = self._get_payload(refresh_token)
+        self._save_session_script(keys=self._get_session_keys(id),
+                                  args=[refresh_payload['sid'], refresh_payload['jti'],
+                                        self._get_session_access(access_token), refresh_payload['exp'],
+                                        int(time.time())])
+
+    def update_session_access_token(self, id: UUID, session_id: str, access_token: str) -> None:
+        """Remember the new access token of the session, so it is revoked with the session."""
+        self._update_session_access_script(keys=self._get_session_keys(id),
+                                           args=[session_id, self._get_session_access(access_token)])
+
+    def check_session_is_valid(self, id: UUID, session_id: str | None, refresh_jti: str) -> bool:
+        """Check that the refresh token belongs to the stored not expired session."""
+        if session_id is None:
+            return False
+        sessions_key, _, expire_key = self._get_session_keys(id)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hget(sessions_key, session_id)
+        pipe.zscore(expire_key, session_id)
+        stored_jti, expire_at = pipe.execute()
+        return stored_jti == refresh_jti.encode() and expire_at is not None and expire_at > time.time()
+
+    def revoke_session(self, id: UUID, session_id: str | None, access_payload: dict | None = None) -> None:
+        """
+        Delete the session and set its access token to compromised.
+
+        :param access_payload: the access token payload of the request, the token is set to compromised too.
+        """
+        access_payload = access_payload or {}
+        self._revoke_session_script(keys=self._get_session_keys(id),
+                                    args=[_as.revoked_tokens_channel, session_id or '',
+                                          access_payload.get('jti', ''), access_payload.get('exp', '')])
+
+    def revoke_all_sessions(self, id: UUID, access_payload: dict | None = None) -> None:
+        """
+        Delete all sessions of the user and set their access tokens to compromised.
+
+        :param access_payload: the access token payload of the request, the token is set to compromised too.
+        """
+        access_payload = access_payload or {}
+        self._revoke_all_sessions_script(keys=self._get_session_keys(id),
+                                         args=[_as.revoked_tokens_channel, access_payload.get('jti', ''),
+                                               access_payload.get('exp', '')])
+
+    def get_sessions_access_tokens(self, user_ids: list[UUID]) -> list[tuple[str, int]]:
+        """Load the access token jti and exp of all sessions of the users with one round trip to Redis."""
+        pipe = self.redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.hvals(self._get_session_keys(user_id)[1])
+        tokens = []
+        for values in pipe.execute():
+            for value in values:
+                jti, exp = value.decode().rsplit(':', 1)
+                tokens.append((jti, int(exp)))
+        return tokens
+
+    def set_token_to_compromised(self, jti: str, exp: int | None = None) -> None:
+        """
+        Set the token to compromised until it expires.
+
+        :param exp: the token expiration time, if it is unknown the token is treated as an access token
+            issued now or earlier.
+        """
+        pipe = self.redis.pipeline()
+        self._set_compromised(pipe, jti, exp)
+        pipe.execute()
+
+    def set_tokens_to_compromised(self, tokens: list[tuple[str, int]]) -> None:
+        """Set several tokens (jti, exp) to compromised with one round trip to Redis."""
+        pipe = self.redis.pipeline(transaction=False)
+        for jti, exp in tokens:
+            self._set_compromised(pipe, jti, exp)
+        pipe.execute()
+
+    def check_token_is_compromised(self, jti: str, exp: int) -> bool:
+        return bool(self.redis.sismember(self._get_bucket_key(exp), jti))
+
+    def check_tokens_are_compromised(self, jtis: list[str], exps: list[int]) -> list[bool]:
+        """Check several tokens (their jti and exp) with one round trip to Redis."""
+        pipe = self.redis.pipeline(transaction=False)
+        for jti, exp in zip(jtis, exps):
+            pipe.sismember(self._get_bucket_key(exp), jti)
+        return [bool(is_member) for is_member in pipe.execute()]
+
+    def get_compromised_tokens(self) -> Iterator[tuple[str, int]]:
+        """Iterate over the compromised tokens (jti) with the time (unix timestamp) they are stored until."""
+        now = time.time()
+        for key in self.redis.scan_iter(match=f'{REVOKED_BUCKET_PREFIX}*', count=100):
+            expire_at = (int(key.decode()[len(REVOKED_BUCKET_PREFIX):]) + 1) * REVOKED_BUCKET_SECONDS
+            if expire_at <= now:
+                continue
+            for jti in self.redis.sscan_iter(key, count=1000):
+                yield jti.decode(), expire_at
+
+    def migrate_legacy_compromised_tokens(self) -> int:
+        """
+        Move the compromised tokens from the legacy 'jtiBlock_<jti>' keys to the buckets.
+
+        The legacy keys do not keep the token expiration time, so a token is blocked in all buckets until
+        the refresh token lifetime from now. The moved tokens are published too, so the running services learn
+        about them. The legacy keys are deleted, so the migration can be rerun.
+        :return: the number of the moved tokens.
+        """
+        moved = 0
+        keys = []
+        for key in self.redis.scan_iter(match=f'{LEGACY_REVOKED_PREFIX}*', count=MIGRATE_CHUNK_SIZE):
+            keys.append(key)
+            if len(keys) == MIGRATE_CHUNK_SIZE:
+                moved += self._migrate_legacy_keys(keys)
+                keys = []
+        if keys:
+            moved += self._migrate_legacy_keys(keys)
+        return moved
+
+    def subscribe_to_compromised_tokens(self):
+        """Subscribe to the tokens which are set to compromised, see _set_compromised."""
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(_as.revoked_tokens_channel)
+        return pubsub
+
+    def _get_session_keys(self, id: UUID) -> list[str]:
         user_id = str(id)
-        self._save_data(f'accessToken_{user_id}', access_token, True)
-        self._save_data(f'refreshToken_{user_id}', refresh_token, False)
-
-    def set_token_to_compromised(self, jti: str, id: UUID | None = None) -> None:
-        self._save_data(f'jtiBlock_{jti}', '', False)
-        if id is not None:
-            user_id = str(id)
-            self.redis.delete(f'accessToken_{user_id}')
-            self.redis.delete(f'refreshToken_{user_id}')
-
-    def check_token_is_compromised(self, jti: str) -> bool:
-        load_jti = self._retrieve_data(f'jtiBlock_{jti}')
-        return load_jti is not None
-
-    def check_refresh_token_is_valid(self, user_id: UUID, refresh_token: str) -> bool:
-        id = str(user_id)
-        load_jwt = self._retrieve_data(f'refreshToken_{id}')
-        return load_jwt == refresh_token
-
-    def get_refresh_token(self, user_id: UUID) -> str:
-        id = str(user_id)
-        load_jwt = self._retrieve_data(f'refreshToken_{id}')
-        return load_jwt
-
-    def _save_data(self, key: str, data: str, is_access: bool) -> None:
-        if is_access is True:
-            expire_time = _as.access_token_lifetime_hours * 60
-        else:
-            expire_time = _as.refresh_token_lifetime_hours * 60
-        self.redis.set(key, data, ex=expire_time)
+        return [key.format(user_id) for key in SESSION_KEYS]
+
+    def _get_payload(self, token: str) -> dict:
+        # the tokens are issued by this service, the signature is checked before they are used
+        return jwt.decode(token, options={'verify_signature': False})
+
+    def _get_session_access(self, access_token: str) -> str:
+        payload = self._get_payload(access_token)
+        return f'{payload["jti"]}:{payload["exp"]}'
 
-    def _retrieve_data(self, key: str) -> str | None:
-        return self.redis.get(key)
+    def _get_bucket_key(self, exp: int) -> str:
+        return f'{REVOKED_BUCKET_PREFIX}{int(exp) // REVOKED_BUCKET_SECONDS}'
+
+    def _migrate_legacy_keys(self, keys: list[bytes]) -> int:
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            jti = key.decode()[len(LEGACY_REVOKED_PREFIX):]
+            self._set_compromised(pipe, jti, lifetime=_as.refresh_token_lifetime_hours * 3600)
+        pipe.delete(*keys)
+        pipe.execute()
+        return len(keys)
+
+    def _set_compromised(self, pipe: Pipeline, jti: str, exp: int | None = None,
+                         lifetime: int | None = None) -> None:
+        """
+        Block the token and notify subscribed services (e.g. the movies API) about the revoked token.
+
+        :param lifetime: the longest token lifetime (seconds) if exp is unknown, the access token lifetime by default.
+        """
+        if exp is None:
+            # the token expires in one of the buckets until its longest lifetime from now
+            now = int(time.time())
+            exp = now + (lifetime or _as.access_token_lifetime_hours * 3600)
+            buckets = range(now // REVOKED_BUCKET_SECONDS, exp // REVOKED_BUCKET_SECONDS + 1)
+        else:
+            buckets = [int(exp) // REVOKED_BUCKET_SECONDS]
+        for bucket in buckets:
+            key = f'{REVOKED_BUCKET_PREFIX}{bucket}'
+            pipe.sadd(key, jti)
+            pipe.expireat(key, (bucket + 1) * REVOKED_BUCKET_SECONDS)
+        message = {'jti': jti, 'exp': exp}
+        pipe.publish(_as.revoked_tokens_channel, json.dumps(message))
 
 
 storage_tokens = StorageTokens(redis_db)
@@ -5,10 +5,13 @@ from enum import Enum
 import jwt
 from database.db_models import User
 from jwt.exceptions import PyJWTError
+from revocation_filter import get_revocation_filter
 from settings import api_settings
 from storage_token import get_storage_tokens
+from user_cache import UserPrincipal
 
 storage = get_storage_tokens()
+revocation_filter = get_revocation_filter()
 
 
 class TokenType(str, Enum):
@@ -16,13 +19,15 @@ class TokenType(str, Enum):
     refresh_token = 'refresh_token'
 
 
-def generate_token(user: User, token_type: TokenType, algorithms: list[str] | None = 'HS256') -> bytes:
+def generate_token(user: User | UserPrincipal, token_type: TokenType, algorithms: list[str] | None = 'HS256',
+                   session_id: str | None = None) -> bytes:
     """
     Generate JWT-token.
 
-    :param user: the user the token is generated for.
+    :param user: the user (or its cached principal) the token is generated for.
     :param token_type: the token type (is used to define secret key and token lifetime).
     :param algorithms: the algorithms to encrypt token.
+    :param session_id: the session (device) the token belongs to.
     :return: JWT-token.
     """
     if token_type == TokenType.access_token:
@@ -39,16 +44,30 @@ def generate_token(user: User, token_type: TokenType, algorithms: list[str] | No
     jti = str(uuid.uuid4())
     payload = {
         'user': str(user.id),
-        'roles': [str(r.name) for r in user.roles],
+        'roles': list(user.role_names),
         'lat': int(datetime.timestamp(lat)),
         'exp': int(datetime.timestamp(exp)),
-        'jti': jti
+        'jti': jti,
+        'sid': session_id,
     }
 
     token = jwt.encode(payload, secret, algorithms)
     return token
 
 
+def generate_session_tokens(user: User) -> tuple[bytes, bytes]:
+    """
+    Generate the access and refresh tokens of a new session.
+
+    :param user: the user the tokens are generated for.
+    :return: the access and refresh tokens.
+    """
+    session_id = str(uuid.uuid4())
+    access_token = generate_token(user, TokenType.access_token, session_id=session_id)
+    refresh_token = generate_token(user, TokenType.refresh_token, session_id=session_id)
+    return access_token, refresh_token
+
+
 def decode_token(token: bytes, token_type: TokenType, algorithms: list[str] | None = 'HS256') -> dict:
     """
     Decode JWT-token.
@@ -68,6 +87,18 @@ def decode_token(token: bytes, token_type: TokenType, algorithms: list[str] | No
     return payload
 
 
+def is_token_compromised(payload: dict) -> bool:
+    """
+    Check whether the token is compromised. Most tokens are not, they are answered by the in-process filter.
+
+    :param payload: the decoded token payload part.
+    :return: True if the token is compromised.
+    """
+    if not revocation_filter.might_contain(payload['jti']):
+        return False
+    return storage.check_token_is_compromised(payload['jti'], payload['exp'])
+
+
 def validate_auth_header(auth_header: str, token_type: TokenType = TokenType.access_token) -> dict:
     """
     Validate the 'Authorization' HTTP header passed as a parameter.
@@ -79,7 +110,7 @@ def validate_auth_header(auth_header: str, token_type: TokenType = TokenType.acc
     try:
         refresh_token = auth_header.split()[1].encode('utf8')
         payload = decode_token(refresh_token, token_type)
-        if storage.check_token_is_compromised(payload['jti']):
+        if is_token_compromised(payload):
             return {'error': 'The token has been compromised. Please, try login again.'}
     except IndexError:
         return {'error': 'Authorization header is wrong. It must be like "Bearer <token>".'}
@@ -0,0 +1,112 @@
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable
+from uuid import UUID
+
+from database.db import redis_db
+from database.db_models import User
+from redis import Redis
+from settings import api_settings as _as
+
+
+USER_CACHE_PREFIX = 'userPrincipal_'
+# the keys deleted by one command
+INVALIDATE_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """The user fields needed by the protected routes, see app_routes.auth.authorization."""
+    id: UUID
+    email: str
+    full_name: str | None
+    role_names: tuple[str, ...]
+
+    @classmethod
+    def from_user(cls, user: User) -> 'UserPrincipal':
+        return cls(user.id, user.email, user.full_name, tuple(user.role_names))
+
+    def to_json(self) -> str:
+        return json.dumps({'id': str(self.id), 'email': self.email, 'full_name': self.full_name,
+                           'role_names': self.role_names})
+
+    @classmethod
+    def from_json(cls, data: bytes) -> 'UserPrincipal':
+        fields = json.loads(data)
+        return cls(UUID(fields['id']), fields['email'], fields['full_name'], tuple(fields['role_names']))
+
+
+class UserCache:
+    """
+    Cache of the user principals: in-process LRU in front of Redis.
+
+    The Redis copy is deleted when the user roles, the password or the user itself are changed. The other workers
+    are not notified, their local copies live no longer than the local TTL, so it is kept short.
+    """
+    def __init__(self, redis: Redis, ttl: int, local_ttl: float, local_max_items: int):
+        self.redis = redis
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.local_max_items = local_max_items
+        self._local: OrderedDict[str, tuple[float, UserPrincipal]] = OrderedDict()
+
+    def get(self, user_id: UUID | str) -> UserPrincipal | None:
+        """Get the principal from the local cache, Redis or the database. None if the user does not exist."""
+        key = self._get_key(user_id)
+        principal = self._get_local(key)
+        if principal is not None:
+            return principal
+        data = self.redis.get(key)
+        if data is not None:
+            principal = UserPrincipal.from_json(data)
+        else:
+            user = User.query.filter_by(id=user_id).first()
+            if user is None:
+                return None
+            principal = UserPrincipal.from_user(user)
+            self.redis.set(key, principal.to_json(), ex=self.ttl)
+        self._set_local(key, principal)
+        return principal
+
+    def invalidate(self, user_ids: Iterable[UUID | str]) -> None:
+        """Drop the principals of the users after their changes are committed."""
+        keys = [self._get_key(user_id) for user_id in user_ids]
+        for key in keys:
+            self._local.pop(key, None)
+        if not keys:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for i in range(0, len(keys), INVALIDATE_CHUNK_SIZE):
+            pipe.delete(*keys[i:i + INVALIDATE_CHUNK_SIZE])
+        pipe.execute()
+
+    def _get_key(self, user_id: UUID | str) -> str:
+        return f'{USER_CACHE_PREFIX}{user_id}'
+
+    def _get_local(self, key: str) -> UserPrincipal | None:
+        item = self._local.get(key)
+        if item is None:
+            return None
+        expire_at, principal = item
+        if expire_at <= time.monotonic():
+            self._local.pop(key, None)
+            return None
+        self._local.move_to_end(key)
+        return principal
+
+    def _set_local(self, key: str, principal: UserPrincipal) -> None:
+        if self.local_ttl <= 0:
+            return
+        self._local[key] = (time.monotonic() + self.local_ttl, principal)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_items:
+            self._local.popitem(last=False)
+
+
+user_cache = UserCache(redis_db, _as.user_cache_ttl, _as.user_cache_local_ttl, _as.user_cache_local_max_items)
+
+
+def get_user_cache() -> UserCache:
+    return user_cache
@@ -5,9 +5,15 @@ from flask import Blueprint
 
 from .create_superuser import create_superuser
 from .create_superuser import create_superuser_role
+from database.db import db
+from services.login_history_partitions import create_partitions, drop_partitions
+from settings import api_settings
+from storage_token import get_storage_tokens
 
 
 cli_bp = Blueprint('superuser', __name__)
+history_cli_bp = Blueprint('history', __name__)
+tokens_cli_bp = Blueprint('tokens', __name__)
 
 logger = logging.getLogger()
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s: %(levelname)s %(message)s')
@@ -28,5 +34,29 @@ def createsuperuser(email, password, full_name):
         create_superuser(email, password, full_name)
     except ValueError as e:
         logger.warning(e)
-   
-    
+
+
+@history_cli_bp.cli.command('create-partitions')
+@click.option('--months-ahead', type=int, default=api_settings.login_history_months_ahead)
+def create_history_partitions(months_ahead):
+    # create the login history partitions of the next months
+    with db.engine.begin() as connection:
+        created = create_partitions(connection, months_ahead)
+    logger.info('Login history partitions created: %s', created)
+
+
+@history_cli_bp.cli.command('drop-partitions')
+@click.option('--keep-months', type=int, default=api_settings.login_history_retention_months)
+@click.option('--detach-only', is_flag=True, help='detach the old partitions without dropping them')
+def drop_history_partitions(keep_months, detach_only):
+    # drop the login history partitions older than the retention period
+    with db.engine.begin() as connection:
+        detached = drop_partitions(connection, keep_months, detach_only)
+    logger.info('Login history partitions detached: %s', detached)
+
+
+@tokens_cli_bp.cli.command('migrate-compromised')
+def migrate_compromised_tokens():
+    # move the compromised tokens from the legacy keys 'jtiBlock_<jti>' to the hourly buckets
+    moved = get_storage_tokens().migrate_legacy_compromised_tokens()
+    logger.info('Compromised tokens moved to the buckets: %s', moved)
@@ -0,0 +1,113 @@
+import time
+from collections import Counter, deque
+from typing import Callable
+
+import bcrypt
+from gevent.threadpool import ThreadPool
+
+from settings import api_settings as _as
+
+
+# the number of the latest calls the latency percentiles are computed from
+LATENCY_WINDOW = 1000
+
+
+def get_rounds(hashed_password: bytes) -> int:
+    """The bcrypt cost (log2 of the number of rounds) the hash was made with."""
+    return int(hashed_password.split(b'$')[2])
+
+
+class PasswordHasherBusy(Exception):
+    """All hashing workers are busy and the queue is full, the request should be retried later."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in the worker threads, so the gevent loop serves other requests while a password is hashed.
+
+    bcrypt releases the GIL, so the workers hash in parallel. The number of the waiting calls is bounded:
+    when the queue is full the call fails at once with PasswordHasherBusy instead of waiting.
+    """
+    def __init__(self, max_workers: int, max_queue: int, rounds: int):
+        self.max_workers = max_workers
+        self.rounds = rounds
+        self.max_pending = max_workers + max_queue
+        # hashed - the calls done, rejected - the calls refused because the queue was full
+        self.stats = Counter(hashed=0, rejected=0)
+        self._pending = 0
+        self._wait_times: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._hash_times: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._pool: ThreadPool | None = None
+
+    def hash_password(self, password: str) -> bytes:
+        """Hash the password with a new salt and the target cost, the salt and the cost are kept in the hash."""
+        return self._run(self._hash_password, password, self.rounds)
+
+    def check_password(self, password: str, hashed_password: bytes) -> bool:
+        """Compare the password with the hash in constant time."""
+        return self._run(bcrypt.checkpw, password.encode('utf8'), hashed_password)
+
+    def needs_rehash(self, hashed_password: bytes) -> bool:
+        """Whether the hash was made with another cost than the target one."""
+        # the hash is '$2b$<cost>$<salt and hash>'
+        return get_rounds(hashed_password) != self.rounds
+
+    def get_stats(self) -> dict:
+        """The counters, the current queue depth and the latency percentiles (in milliseconds) of the process."""
+        return {
+            **self.stats,
+            'in_progress': min(self._pending, self.max_workers),
+            'queue_depth': max(self._pending - self.max_workers, 0),
+            'wait_ms': self._get_percentiles(self._wait_times),
+            'hash_ms': self._get_percentiles(self._hash_times),
+        }
+
+    def _run(self, func: Callable, *args):
+        if self._pending >= self.max_pending:
+            self.stats['rejected'] += 1
+            raise PasswordHasherBusy()
+        self._pending += 1
+        submitted = time.monotonic()
+        try:
+            result, started, finished = self._get_pool().spawn(self._measure, func, *args).get()
+        finally:
+            self._pending -= 1
+        self.stats['hashed'] += 1
+        self._wait_times.append(started - submitted)
+        self._hash_times.append(finished - started)
+        return result
+
+    def _get_pool(self) -> ThreadPool:
+        # the pool belongs to the hub of the thread which creates it, so it is created on the first call
+        if self._pool is None:
+            self._pool = ThreadPool(self.max_workers)
+        return self._pool
+
+    @staticmethod
+    def _measure(func: Callable, *args) -> tuple:
+        started = time.monotonic()
+        result = func(*args)
+        return result, started, time.monotonic()
+
+    @staticmethod
+    def _hash_password(password: str, rounds: int) -> bytes:
+        return bcrypt.hashpw(password.encode('utf8'), bcrypt.gensalt(rounds))
+
+    @staticmethod
+    def _get_percentiles(times: deque[float]) -> dict[str, float]:
+        if not times:
+            return {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+        ordered = sorted(times)
+        return {
+            'p50': round(ordered[len(ordered) // 2] * 1000, 3),
+            'p99': round(ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)] * 1000, 3),
+            'max': round(ordered[-1] * 1000, 3),
+        }
+
+
+password_hasher = PasswordHasher(_as.password_hashing_workers, _as.password_hashing_queue_size,
+                                 _as.password_hashing_rounds)
+
+
+def get_password_hasher() -> PasswordHasher:
+    return password_hasher
@@ -1,33 +1,34 @@
-import requests
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 
 from core.config import api_settings
-from models.auth import IsTokenCompromised, TokenData
+from models.auth import TokenData
+from services.revoked_tokens import RevokedTokens, get_revoked_tokens
+from services.token_checker import RemoteTokenChecker, get_token_checker
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/auth/login/')
 router = APIRouter()
 
 
-def check_token_in_black_list(token: str) -> dict[str, bool]:
-    url = api_settings.check_token_is_compromised_url
-    try:
-        response = requests.post(url, json={'access_token': token})
-        return response.json()
-    except Exception:
-        return {'is_compromised': True}
-
+async def authenticate(token: str = Depends(oauth2_scheme),
+                       revoked_tokens: RevokedTokens = Depends(get_revoked_tokens),
+                       token_checker: RemoteTokenChecker = Depends(get_token_checker)):
+    """
+    Verify the access token.
 
-async def authenticate(token: str = Depends(oauth2_scheme)):
+    In the local mode revoked tokens are pushed by the auth service (see RevocationListener), in the remote and grpc
+    modes the token is checked by the auth service.
+    """
     try:
         payload = jwt.decode(token, api_settings.access_token_secret_key, algorithms=[api_settings.token_algoritm])
         token_data = TokenData(**payload)
-        is_compromised_data = check_token_in_black_list(token)
-        check_compromised = IsTokenCompromised(**is_compromised_data)
-        if check_compromised.is_compromised:
+        if api_settings.token_check_mode != 'local':
+            is_revoked = await token_checker.is_revoked(token, token_data)
+        else:
+            is_revoked = revoked_tokens.is_revoked(token_data.jti)
+        if is_revoked:
             raise JWTError('Token maybe compromised. Try login again and use new access token.')
     except JWTError as e:
         credentials_exception = HTTPException(
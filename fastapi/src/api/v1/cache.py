@@ -0,0 +1,36 @@
+from api.v1.response_models import (CacheInvalidateRequest,
+                                    CacheInvalidateResponse,
+                                    CacheStatsResponse)
+from services.cache import get_cache_stats, invalidate_tags
+
+from fastapi import APIRouter
+
+router = APIRouter()
+
+
+@router.get('/stats',
+            response_model=CacheStatsResponse,
+            summary='Статистика кеша',
+            description='Счетчики попаданий, промахов и объединенных запросов к Elasticsearch',
+            response_description='Счетчики кеша текущего процесса',
+            )
+async def cache_stats() -> CacheStatsResponse:
+    """Show the cache counters of the current worker process."""
+    return CacheStatsResponse(**get_cache_stats())
+
+
+@router.post('/invalidate',
+             response_model=CacheInvalidateResponse,
+             summary='Сброс кеша по тегам',
+             description='Удаление из кеша всех ответов, помеченных любым из тегов, во всех воркерах',
+             response_description='Количество удаленных записей кеша',
+             )
+async def cache_invalidate(request: CacheInvalidateRequest) -> CacheInvalidateResponse:
+    """
+    Delete the cached responses by their tags.
+
+    :param request: the tags to invalidate.
+    :return: the number of deleted cache entries.
+    """
+    deleted = await invalidate_tags(request.tags)
+    return CacheInvalidateResponse(deleted=deleted)
@@ -4,7 +4,9 @@ from api.v1.auth import TokenData, authenticate
 from api.v1.access_rules import is_privilege_user
 from api.v1.response_models import (FilmResponse, FilmsListResponse,
                                     FilmSortSelection, PaginatedParams)
+from api.v1.utils import batch_ids, cached_json_response, get_search_after
 from core import messages
+from core.config import api_settings
 from interfaces.composition_services import get_film_service
 from services.film import FilmService
 
@@ -12,6 +14,22 @@ from services.film import FilmService
 router = APIRouter()
 
 
+@router.get('/batch/',
+            response_model=list[FilmResponse],
+            summary='Информация по списку кинопроизведений',
+            description='Поиск кинопроизведений по списку uuid',
+            response_description='Полная информация по найденным кинопроизведениям',
+            tags=['Поиск по uuid']
+            )
+async def film_batch(
+    ids: list[str] = Query(..., description='uuid кинопроизведений'),
+    film_service: FilmService = Depends(get_film_service),
+) -> list[FilmResponse]:
+    """Show the films by their UUIDs. The films not found are skipped."""
+    films = await film_service.get_many_by_ids(batch_ids(ids), raw=api_settings.cache_raw_responses)
+    return cached_json_response(films)
+
+
 @router.get('/{film_id}',
             response_model=FilmResponse,
             summary='Информация по кинопроизведению',
@@ -25,11 +43,11 @@ async def film_details(
     #token_data: TokenData = Depends(authenticate)
 ) -> FilmResponse:
     """Show a film by its UUID."""
-    film = await film_service.get_by_id(film_id)
+    film = await film_service.get_by_id(film_id, raw=api_settings.cache_raw_responses)
     if not film:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=messages.FILM_NOT_FOUND)
-    return film
+    return cached_json_response(film)
 
 
 @router.get('/search/',
@@ -47,11 +65,14 @@ async def film_search(
     #token_data: TokenData = Depends(authenticate)
 ) -> FilmsListResponse:
     """Show the short film list. Query by movie title."""
-    films = await film_service.search(query=query, page=paginated_params.page, size=paginated_params.size, sort=sort)
+    films = await film_service.search(query=query, page=paginated_params.page, size=paginated_params.size, sort=sort,
+                                      search_after=get_search_after(paginated_params, sort),
+                                      exact_total=paginated_params.exact_total,
+                                      raw=api_settings.cache_raw_responses)
     if not films:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=messages.FILM_NOT_FOUND)
-    return films
+    return cached_json_response(films)
 
 
 @router.get('/',
@@ -73,9 +94,12 @@ async def film_list(
     privilege_user = True
     page = paginated_params.page if privilege_user else 1
     size = paginated_params.size if privilege_user else 3
+    search_after = get_search_after(paginated_params, sort) if privilege_user else None
 
-    films = await film_service.get_list(sort, filter, page, size)
+    films = await film_service.get_list(sort, filter, page, size, search_after=search_after,
+                                        exact_total=paginated_params.exact_total,
+                                        raw=api_settings.cache_raw_responses)
     if not films:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=messages.FILM_NOT_FOUND)
-    return films
+    return cached_json_response(films)
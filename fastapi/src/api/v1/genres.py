@@ -2,15 +2,39 @@ from http import HTTPStatus
 
 from api.v1.response_models import (GenreListResponse, GenreResponse,
                                     GenreSortSelection, PaginatedParams)
+from api.v1.utils import batch_ids, cached_json_response, get_search_after
 from core import messages
+from core.config import api_settings
 from interfaces.composition_services import get_genre_service
 from services.genre import GenreService
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 router = APIRouter()
 
 
+@router.get('/batch/',
+            response_model=list[GenreResponse],
+            summary='Информация по списку жанров',
+            description='Поиск жанров по списку uuid',
+            response_description='Полная информация по найденным жанрам',
+            tags=['Поиск по uuid']
+            )
+async def genre_batch(
+    ids: list[str] = Query(..., description='uuid жанров'),
+    genre_service: GenreService = Depends(get_genre_service)
+) -> list[GenreResponse]:
+    """
+    Show the genres by their UUIDs. The genres not found are skipped.
+
+    :param ids: genre UUIDs.
+    :param genre_service: the request handling service.
+    :return: the genres found.
+    """
+    genres = await genre_service.get_many_by_ids(batch_ids(ids), raw=api_settings.cache_raw_responses)
+    return cached_json_response(genres)
+
+
 @router.get('/{genre_id}',
             response_model=GenreResponse,
             summary='Информация по жанру',
@@ -29,10 +53,10 @@ async def genre_details(
     :param genre_service: the request handling service.
     :return: the genre.
     """
-    genre = await genre_service.get_by_id(genre_id)
+    genre = await genre_service.get_by_id(genre_id, raw=api_settings.cache_raw_responses)
     if not genre:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=messages.GENRE_NOT_FOUND)
-    return GenreResponse(id=genre.id, name=genre.name, description=genre.description)
+    return cached_json_response(genre)
 
 
 @router.get('/',
@@ -52,11 +76,16 @@ async def genre_list(
     :param genre_service: the request handling service.
     :param paginated_params: parameters to paginate:
         size - the records number per page,
-        page - the page number.
+        page - the page number,
+        cursor - the page cursor (the cursor pagination mode),
+        exact_total - count all records to compute the last page number.
     :param sort: a comma-separated list of <field>:<direction> pairs. Note: not all field types can be sorted.
     :return: the genre list.
     """
     if sort is not None:
         sort = sort.value
-    genres = await genre_service.get_list(paginated_params.size, paginated_params.page, sort)
-    return genres
+    genres = await genre_service.get_list(paginated_params.size, paginated_params.page, sort,
+                                          search_after=get_search_after(paginated_params, sort),
+                                          exact_total=paginated_params.exact_total,
+                                          raw=api_settings.cache_raw_responses)
+    return cached_json_response(genres)
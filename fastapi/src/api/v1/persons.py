@@ -3,11 +3,13 @@ from http import HTTPStatus
 from api.v1.response_models import (FilmShortListResponse, FilmSortSelection,
                                     PaginatedParams, PersonListResponse,
                                     PersonResponse, PersonSortSelection)
+from api.v1.utils import batch_ids, cached_json_response, get_search_after
 from core import messages
+from core.config import api_settings
 from interfaces.composition_services import get_person_service
 from services.person import PersonService
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 router = APIRouter()
 
@@ -28,15 +30,20 @@ async def person_list(
 
     :param paginated_params: parameters to paginate:
         size - the records number per page,
-        page - the page number.
+        page - the page number,
+        cursor - the page cursor (the cursor pagination mode),
+        exact_total - count all records to compute the last page number.
     :param sort: a comma-separated list of <field>:<direction> pairs. Note: not all field types can be sorted.
     :param person_service: the request handling service.
     :return: the person list.
     """
     if sort is not None:
         sort = sort.value
-    response = await person_service.get_list(paginated_params.size, paginated_params.page, sort)
-    return response
+    response = await person_service.get_list(paginated_params.size, paginated_params.page, sort,
+                                             search_after=get_search_after(paginated_params, sort),
+                                             exact_total=paginated_params.exact_total,
+                                             raw=api_settings.cache_raw_responses)
+    return cached_json_response(response)
 
 
 @router.get('/search',
@@ -57,12 +64,40 @@ async def person_search(
     :param query: the search query
     :param paginated_params: parameters to paginate:
         size - the records number per page,
-        page - the page number.
+        page - the page number,
+        cursor - the page cursor (the cursor pagination mode),
+        exact_total - count all records to compute the last page number.
     :param person_service: the request handling service.
     :return: the persons found.
     """
-    response = await person_service.search(query, paginated_params.size, paginated_params.page)
-    return response
+    sort = PersonSortSelection.full_name_asc.value
+    response = await person_service.search(query, paginated_params.size, paginated_params.page, sort,
+                                           search_after=get_search_after(paginated_params, sort),
+                                           exact_total=paginated_params.exact_total,
+                                           raw=api_settings.cache_raw_responses)
+    return cached_json_response(response)
+
+
+@router.get('/batch',
+            response_model=list[PersonResponse],
+            summary='Информация по списку персон',
+            description='Поиск персон по списку uuid',
+            response_description='Полная информация по найденным персонам',
+            tags=['Поиск по uuid']
+            )
+async def person_batch(
+        ids: list[str] = Query(..., description='uuid персон'),
+        person_service: PersonService = Depends(get_person_service)
+) -> list[PersonResponse]:
+    """
+    Get persons by their UUIDs. The persons not found are skipped.
+
+    :param ids: the person UUIDs.
+    :param person_service: the request handling service.
+    :return: the persons found.
+    """
+    persons = await person_service.get_many_by_ids(batch_ids(ids), raw=api_settings.cache_raw_responses)
+    return cached_json_response(persons)
 
 
 @router.get('/{person_id}',
@@ -83,10 +118,10 @@ async def person_details(
     :param person_service: the request handling service.
     :return: the person.
     """
-    person = await person_service.get_by_id(person_id)
+    person = await person_service.get_by_id(person_id, raw=api_settings.cache_raw_responses)
     if not person:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=messages.PERSON_NOT_FOUND)
-    return person
+    return cached_json_response(person)
 
 
 @router.get('/{person_id}/film',
@@ -106,14 +141,19 @@ async def person_films(person_id: str,
     :param person_id: the person UUID.
     :param paginated_params: parameters to paginate:
         size - the records number per page,
-        page - the page number.
+        page - the page number,
+        cursor - the page cursor (the cursor pagination mode),
+        exact_total - count all records to compute the last page number.
     :param sort: a comma-separated list of <field>:<direction> pairs. Note: not all field types can be sorted.
     :param person_service: the request handling service.
     :return: the films found.
     """
-    if sort is not None:
-        sort = sort.value
-    films = await person_service.get_person_films(person_id, paginated_params.size, paginated_params.page, sort)
+    # the cursor is decoded with the sort the service applies by default
+    sort = (sort or FilmSortSelection.rating_desc).value
+    films = await person_service.get_person_films(person_id, paginated_params.size, paginated_params.page, sort,
+                                                  search_after=get_search_after(paginated_params, sort),
+                                                  exact_total=paginated_params.exact_total,
+                                                  raw=api_settings.cache_raw_responses)
     if films is None:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=messages.PERSON_NOT_FOUND)
-    return films
+    return cached_json_response(films)
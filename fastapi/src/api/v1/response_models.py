@@ -12,6 +12,10 @@ from fastapi import Query
 class PaginatedParams(BaseModel):
     size: int = Query(api_settings.default_response_page_size, description='page[size]', ge=1, le=api_settings.max_page_size)
     page: int = Query(1, description='page[number]', ge=1)
+    cursor: str | None = Query(None, description='курсор страницы из next_cursor, пустая строка - первая страница. '
+                                                 'Если задан, то page не учитывается, а номера страниц не вычисляются')
+    exact_total: bool = Query(False, description='посчитать все найденные записи, чтобы вычислить номер последней '
+                                                 'страницы (last). Иначе записи считаются до ES_TRACK_TOTAL_HITS')
 
 
 class PaginatedListMixin(OrjsonMixin):
@@ -19,6 +23,7 @@ class PaginatedListMixin(OrjsonMixin):
     next: int | None
     first: int | None
     last: int | None
+    next_cursor: str | None  # is set in the cursor pagination mode only
     data: list  # list of objects
 
 
@@ -48,7 +53,7 @@ class FilmShortResponse(OrjsonMixin):
 
 
 class FilmShortListResponse(PaginatedListMixin):
-    data = list[FilmShortResponse]
+    data: list[FilmShortResponse]
 
 
 class GenreResponse(OrjsonMixin):
@@ -88,3 +93,20 @@ class FilmResponse(OrjsonMixin):
 
 class FilmsListResponse(PaginatedListMixin):
     data: list[FilmShortResponse]
+
+
+# Cache models
+
+class CacheStatsResponse(OrjsonMixin):
+    hits: int
+    misses: int
+    coalesced: int
+    refreshes: int
+
+
+class CacheInvalidateRequest(BaseModel):
+    tags: list[str] = Field(description="теги записей кеша, например 'film:<uuid>', 'genre:<uuid>', 'index:movies'")
+
+
+class CacheInvalidateResponse(OrjsonMixin):
+    deleted: int
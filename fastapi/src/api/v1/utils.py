@@ -0,0 +1,55 @@
+from enum import Enum
+from http import HTTPStatus
+
+from api.v1.response_models import PaginatedParams
+from core import messages
+from core.config import api_settings
+from services.utils import decode_cursor
+
+from fastapi import HTTPException, Response
+
+
+def cached_json_response(data):
+    """
+    Wrap the JSON bytes taken from the cache into the response.
+
+    FastAPI does not validate and serialize the returned Response again, pydantic models are returned as is.
+
+    :param data: the JSON bytes or the pydantic model.
+    :return: the response or the model.
+    """
+    if isinstance(data, bytes):
+        return Response(content=data, media_type='application/json')
+    return data
+
+
+def batch_ids(ids: list[str]) -> list[str]:
+    """
+    Remove the duplicates from the requested ids keeping their order.
+
+    :param ids: the requested ids.
+    :return: the unique ids.
+    """
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > api_settings.max_page_size:
+        raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                            detail=messages.TOO_MANY_IDS.format(api_settings.max_page_size))
+    return ids
+
+
+def get_search_after(paginated_params: PaginatedParams, sort: str | Enum | None) -> list | None:
+    """
+    Decode the cursor of the requested page.
+
+    :param paginated_params: the pagination parameters.
+    :param sort: the sort of the requested list.
+    :return: None - paginate by page numbers, [] - the first page, the sort values of the last record otherwise.
+    """
+    if paginated_params.cursor is None:
+        return None
+    if paginated_params.cursor == '':
+        return []
+    try:
+        return decode_cursor(paginated_params.cursor, sort)
+    except ValueError as error:
+        raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail=str(error))
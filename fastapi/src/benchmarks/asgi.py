@@ -0,0 +1,65 @@
+import statistics
+import time
+
+from fastapi import FastAPI
+
+
+async def call(app: FastAPI, path: str, query: str = '') -> tuple[int, bytes]:
+    """
+    Send one GET request to the ASGI application in-process, without the network and the HTTP server.
+
+    :param app: the application.
+    :param path: the request path.
+    :param query: the query string.
+    :return: the response status and body.
+    """
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'benchmark')],
+        'client': ('127.0.0.1', 0),
+        'server': ('benchmark', 80),
+    }
+    response = {'status': None, 'body': []}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            response['body'].append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return response['status'], b''.join(response['body'])
+
+
+async def measure(app: FastAPI, path: str, query: str, requests: int) -> dict[str, float]:
+    """
+    Send the same request several times and measure it.
+
+    :return: p50 and p99 latency and the mean CPU time per request, in milliseconds.
+    """
+    latencies = []
+    cpu_times = []
+    for _ in range(requests):
+        started, cpu_started = time.perf_counter(), time.process_time()
+        status, _ = await call(app, path, query)
+        latencies.append(time.perf_counter() - started)
+        cpu_times.append(time.process_time() - cpu_started)
+        if status != 200:
+            raise RuntimeError(f'{path}?{query} returned {status}')
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        'p50': percentiles[49] * 1000,
+        'p99': percentiles[98] * 1000,
+        'cpu': statistics.mean(cpu_times) * 1000,
+    }
@@ -0,0 +1,48 @@
+"""
+Compare cache hits served as raw JSON bytes with cache hits parsed into pydantic models.
+
+Run it inside the fastapi container (Redis and Elasticsearch must be available):
+    python -m benchmarks.cache_responses --requests 2000
+"""
+import argparse
+import asyncio
+
+import orjson
+from core.config import api_settings
+from main import app
+
+from benchmarks.asgi import call, measure
+
+
+async def run(requests: int) -> None:
+    await app.router.startup()
+    try:
+        status, body = await call(app, '/api/v1/films/', 'size=1')
+        if status != 200:
+            raise RuntimeError(f'Can not get a film: {status}')
+        film_id = orjson.loads(body)['data'][0]['id']
+        endpoints = [
+            (f'/api/v1/films/{film_id}', ''),
+            ('/api/v1/films/', 'size=50'),
+            ('/api/v1/films/search/', 'query=star&size=50'),
+            ('/api/v1/persons/', 'size=50'),
+        ]
+        print(f'{"endpoint":<50}{"mode":<8}{"p50, ms":>10}{"p99, ms":>10}{"cpu, ms":>10}')
+        for path, query in endpoints:
+            # the first request puts the response into the cache
+            await call(app, path, query)
+            for raw in (False, True):
+                api_settings.cache_raw_responses = raw
+                result = await measure(app, path, query, requests)
+                mode = 'raw' if raw else 'model'
+                print(f'{path + "?" + query:<50}{mode:<8}{result["p50"]:>10.3f}{result["p99"]:>10.3f}'
+                      f'{result["cpu"]:>10.3f}')
+    finally:
+        await app.router.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the cached responses')
+    parser.add_argument('--requests', type=int, default=1000, help='the number of requests per endpoint and mode')
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
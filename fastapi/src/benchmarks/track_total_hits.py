@@ -0,0 +1,66 @@
+"""
+Compare the cost of counting the matched records in Elasticsearch.
+
+Runs the same list query with the exact count, with the count capped by ES_TRACK_TOTAL_HITS and without the count.
+Run it inside the fastapi container:
+    python -m benchmarks.track_total_hits --requests 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from core.config import api_settings
+from elasticsearch import AsyncElasticsearch
+
+QUERIES = {
+    'movies match_all': ('movies', {'match_all': {}}, 'imdb_rating:desc'),
+    'movies title match': ('movies', {'match': {'title': {'query': 'the'}}}, 'imdb_rating:desc'),
+    'persons match_all': ('persons', {'match_all': {}}, 'full_name.raw:asc'),
+}
+
+
+async def measure(es: AsyncElasticsearch, index: str, query: dict, sort: str, track_total_hits: int | bool,
+                  requests: int) -> dict[str, float | dict | None]:
+    latencies = []
+    took = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await es.search(index=index, sort=sort,
+                                   body={'query': query, 'size': 20, 'track_total_hits': track_total_hits},
+                                   request_cache=False)
+        latencies.append(time.perf_counter() - started)
+        took.append(response['took'])
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        'p50': percentiles[49] * 1000,
+        'p99': percentiles[98] * 1000,
+        'took': statistics.mean(took),
+        # ES leaves out the total when it is not tracked
+        'total': response['hits'].get('total'),
+    }
+
+
+async def run(requests: int) -> None:
+    es = AsyncElasticsearch(hosts=[f'{api_settings.elastic_host}:{api_settings.elastic_port}'])
+    modes = {
+        'exact': True,
+        f'capped {api_settings.es_track_total_hits}': api_settings.es_track_total_hits,
+        'skipped': False,
+    }
+    try:
+        print(f'{"query":<22}{"mode":<14}{"p50, ms":>10}{"p99, ms":>10}{"took, ms":>10}  total')
+        for name, (index, query, sort) in QUERIES.items():
+            for mode, track_total_hits in modes.items():
+                result = await measure(es, index, query, sort, track_total_hits, requests)
+                print(f'{name:<22}{mode:<14}{result["p50"]:>10.3f}{result["p99"]:>10.3f}{result["took"]:>10.2f}  '
+                      f'{result["total"]}')
+    finally:
+        await es.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the total hits counting')
+    parser.add_argument('--requests', type=int, default=200, help='the number of requests per query and mode')
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
@@ -1,4 +1,5 @@
 from logging import config as logging_config
+from typing import Literal
 
 from core.logger import LOGGING
 from pydantic import BaseSettings, Field
@@ -12,13 +13,43 @@ class ApiSettings(BaseSettings):
     redis_host: str = 'redis'
     redis_port: int = 6379
     redis_cache_expire: int = 300
+    redis_cache_stale_expire: int = 300
+    cache_xfetch_beta: float = 1.0
+    cache_raw_responses: bool = True
+    cache_key_namespace: str = 'movies'
+    cache_key_version: int = 1
+    local_cache_enabled: bool = True
+    local_cache_ttl: float = 30
+    local_cache_max_items: int = 10000
+    local_cache_max_bytes: int = 64 * 1024 * 1024
+    cache_invalidation_channel: str = 'cache_invalidation'
     elastic_host: str = Field('es', env='ES_HOST')
     elastic_port: int = Field(9200, env='ES_PORT')
     default_response_page_size: int = 20
     max_page_size: int = 100
+    # ES counts the matched records up to this number, the exact count is requested with exact_total
+    es_track_total_hits: int = 1000
+    genre_names_refresh_interval: float = 300
     access_token_secret_key: str
     token_algoritm: str = 'HS256'
+    auth_redis_host: str = 'auth_redis'
+    auth_redis_port: int = 6379
+    revoked_tokens_channel: str = 'revoked_tokens'
+    revoked_tokens_reconnect_delay: float = 1.0
+    # local - the revoked tokens are pushed by the auth service, remote (HTTP) and grpc - every token is checked by
+    # the auth service
+    token_check_mode: Literal['local', 'remote', 'grpc'] = 'local'
+    # where the revoked tokens are pushed from in the local mode: the auth Redis or the auth gRPC server
+    revoked_tokens_source: Literal['redis', 'grpc'] = 'redis'
+    auth_grpc_host: str = 'auth-grpc'
+    auth_grpc_port: int = 50051
     check_token_is_compromised_url: str = 'http://auth:5000/auth/tokens/is-in-black-list/'
+    token_check_timeout: float = 0.5
+    token_check_max_connections: int = 100
+    token_check_cache_ttl: float = 30
+    token_check_cache_max_items: int = 100000
+    token_check_breaker_failures: int = 5
+    token_check_breaker_reset_timeout: float = 10
 
 
 api_settings = ApiSettings()
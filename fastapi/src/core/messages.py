@@ -10,3 +10,5 @@ ERROR_ACCESS_DENIED = 'You are not allowed to perform this action'
 SHOULD_BE_GREATER_THAN = '{} should be greater than {}!'
 SHOULD_BE_AT_LEAST = '{} should be at least {}!'
 SHOULD_BE_AT_MOST = '{} should be at most {}'
+TOO_MANY_IDS = 'No more than {} ids can be requested at once'
+INVALID_CURSOR = 'The cursor is invalid or was made for another sort'
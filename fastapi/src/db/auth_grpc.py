@@ -0,0 +1,8 @@
+from grpc import aio
+
+# the persistent channel to the gRPC server of the auth service
+channel: aio.Channel | None = None
+
+
+def get_auth_grpc_channel() -> aio.Channel:
+    return channel
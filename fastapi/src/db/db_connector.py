@@ -7,15 +7,19 @@ class DBConnector(ABC):
         pass
 
     @abstractmethod
-    async def get(self, source, item_id):
+    async def get(self, source, item_id, fields=None):
         pass
 
     @abstractmethod
-    async def get_page(self, source, size, page, sort):
+    async def mget(self, source, item_ids, fields=None):
         pass
 
     @abstractmethod
-    async def search(self, source, query, size, page, sort):
+    async def get_page(self, source, size, page, sort, search_after=None, exact_total=False, fields=None):
+        pass
+
+    @abstractmethod
+    async def search(self, source, query, size, page, sort, search_after=None, exact_total=False, fields=None):
         pass
 
     @abstractmethod
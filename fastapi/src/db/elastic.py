@@ -1,8 +1,11 @@
+from core.config import api_settings
 from db.db_connector import DBConnector
 from elasticsearch import AsyncElasticsearch, NotFoundError
 
 
 class ElasticSearchConnector(DBConnector):
+    # the unique keyword field of every index
+    TIEBREAKER_SORT_FIELD = 'id'
     RAW_SORT_FIELDS = {
         'persons': ['full_name'],
         'movies': ['title'],
@@ -24,35 +27,80 @@ class ElasticSearchConnector(DBConnector):
                 return f'{field_name}.raw:{order}'
         return sort
 
-    def _prepare_search_query(self, source: str, query: str | dict, size: int, page: int, sort: str) -> dict:
-        offset = (page - 1) * size
-        body = {'query': query, 'from': offset, 'size': size}
-        response_data = {'index': source, 'body': body}
-        sort = self._handle_sort(source, sort)
-        if sort is not None:
-            response_data['sort'] = sort
+    def _prepare_search_query(self, source: str, query: str | dict, size: int, page: int, sort: str,
+                              search_after: list | None = None, exact_total: bool = False,
+                              fields: list[str] | None = None) -> dict:
+        if search_after is not None:
+            response_data = self._prepare_search_after_query(source, query, size, sort, search_after)
+        else:
+            offset = (page - 1) * size
+            # ES stops counting the matched records at the threshold and reports the total as a lower bound ('gte')
+            track_total_hits = True if exact_total else api_settings.es_track_total_hits
+            body = {'query': query, 'from': offset, 'size': size, 'track_total_hits': track_total_hits}
+            response_data = {'index': source, 'body': body}
+            sort = self._handle_sort(source, sort)
+            if sort is not None:
+                response_data['sort'] = sort
+        if fields is not None:
+            # ES returns only the fields of the documents we use
+            response_data['body']['_source'] = fields
         return response_data
 
+    def _prepare_search_after_query(self, source: str, query: str | dict, size: int, sort: str | None,
+                                    search_after: list) -> dict:
+        """
+        Prepare the query of the page which follows the record with the search_after sort values.
+
+        The sort always ends with the unique id, so the order of records is total and no record is skipped or
+        repeated between pages. The total number of records is not counted.
+        """
+        body_sort = []
+        if sort is not None:
+            for field_sort in sort.split(','):
+                field, order = self._handle_sort(source, field_sort).split(':')
+                body_sort.append({field: order})
+        body_sort.append({self.TIEBREAKER_SORT_FIELD: 'asc'})
+        body = {'query': query, 'size': size, 'sort': body_sort, 'track_total_hits': False}
+        if search_after:
+            body['search_after'] = search_after
+        return {'index': source, 'body': body}
+
     def __init__(self, host: str, port: int) -> None:
         """
         Initialize a database connection.
         """
         self.connector = AsyncElasticsearch(hosts=[f'{host}:{port}'])
 
-    async def get(self, source: str, item_id: str) -> dict | None:
+    async def get(self, source: str, item_id: str, fields: list[str] | None = None) -> dict | None:
         """
         Get a single record from a database source.
 
         :param source: a source of database (table name, index, etc.)
         :param item_id: an identifier to get the record.
+        :param fields: the fields of the record to return, None - all fields.
         """
         try:
-            doc = await self.connector.get(source, item_id)
+            doc = await self.connector.get(source, item_id, _source_includes=fields)
         except NotFoundError:
             return None
         return doc['_source']
 
-    async def get_page(self, source: str, size: int, page: int, sort: str) -> dict:
+    async def mget(self, source: str, item_ids: list[str], fields: list[str] | None = None) -> list[dict | None]:
+        """
+        Get several records from a database source with one request.
+
+        :param source: a source of database (table name, index, etc.)
+        :param item_ids: identifiers to get the records.
+        :param fields: the fields of the records to return, None - all fields.
+        :return: the records in the order of item_ids, None for the records not found.
+        """
+        if not item_ids:
+            return []
+        response = await self.connector.mget(body={'ids': item_ids}, index=source, _source_includes=fields)
+        return [doc['_source'] if doc.get('found') else None for doc in response['docs']]
+
+    async def get_page(self, source: str, size: int, page: int, sort: str, search_after: list | None = None,
+                       exact_total: bool = False, fields: list[str] | None = None) -> dict:
         """
         Returns a list of records on defined page.
 
@@ -60,13 +108,19 @@ class ElasticSearchConnector(DBConnector):
         :param size: a number of records per page.
         :param page: the page number
         :param sort: a comma-separated list of <field>:<direction> pairs. Note: not all field types can be sorted.
+        :param search_after: the sort values of the last record of the previous page ([] - the first page). If it is
+            set, the page number is ignored.
+        :param exact_total: count all matched records. Otherwise they are counted up to ES_TRACK_TOTAL_HITS.
+        :param fields: the fields of the records to return, None - all fields.
         :return: a list of records on defined page.
         """
         query = {'match_all': {}}
-        response_data = self._prepare_search_query(source, query, size, page, sort)
+        response_data = self._prepare_search_query(source, query, size, page, sort, search_after, exact_total, fields)
         return await self.connector.search(**response_data)
 
-    async def search(self, source: str, query: str, size: int, page: int, sort: str) -> dict:
+    async def search(self, source: str, query: str, size: int, page: int, sort: str,
+                     search_after: list | None = None, exact_total: bool = False,
+                     fields: list[str] | None = None) -> dict:
         """
         Search for records satisfied the search query.
 
@@ -75,9 +129,13 @@ class ElasticSearchConnector(DBConnector):
         :param size: a number of records per page.
         :param page: the page number
         :param sort: a comma-separated list of <field>:<direction> pairs. Note: not all field types can be sorted.
+        :param search_after: the sort values of the last record of the previous page ([] - the first page). If it is
+            set, the page number is ignored.
+        :param exact_total: count all matched records. Otherwise they are counted up to ES_TRACK_TOTAL_HITS.
+        :param fields: the fields of the records to return, None - all fields.
         :return: a list of found records on defined page.
         """
-        response_data = self._prepare_search_query(source, query, size, page, sort)
+        response_data = self._prepare_search_query(source, query, size, page, sort, search_after, exact_total, fields)
         return await self.connector.search(**response_data)
 
     async def close(self):
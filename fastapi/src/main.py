@@ -1,10 +1,15 @@
 import aioredis
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
+from grpc import aio
 
-from api.v1 import auth, films, genres, persons
+from api.v1 import auth, cache, films, genres, persons
 from core.config import api_settings
-from db import db_connector, elastic, redis
+from db import auth_grpc, db_connector, elastic, redis
+from services.genre_names import genre_names
+from services.revoked_tokens import revocation_listener
+from services.token_checker import token_checker
+from storage.lru_redis_storage import lru_redis_storage
 
 
 app = FastAPI(
@@ -25,10 +30,25 @@ async def startup():
         host=api_settings.elastic_host,
         port=api_settings.elastic_port,
     )
+    if api_settings.token_check_mode == 'grpc' or api_settings.revoked_tokens_source == 'grpc':
+        auth_grpc.channel = aio.insecure_channel(f'{api_settings.auth_grpc_host}:{api_settings.auth_grpc_port}')
+    if api_settings.token_check_mode != 'local':
+        await token_checker.start()
+    else:
+        await revocation_listener.start()
+    await genre_names.start()
+    if api_settings.local_cache_enabled:
+        await lru_redis_storage.start()
 
 
 @app.on_event('shutdown')
 async def shutdown():
+    await revocation_listener.stop()
+    await token_checker.stop()
+    if auth_grpc.channel is not None:
+        await auth_grpc.channel.close()
+    await genre_names.stop()
+    await lru_redis_storage.stop()
     redis.redis.close()
     await redis.redis.wait_closed()
     await db_connector.db_connector.close()
@@ -38,3 +58,5 @@ app.include_router(films.router, prefix='/api/v1/films', tags=['films'])
 app.include_router(genres.router, prefix='/api/v1/genres', tags=['genres'])
 app.include_router(persons.router, prefix='/api/v1/persons', tags=['persons'])
 app.include_router(auth.router, prefix='/api/v1/auth', tags=['auth'])
+# the internal endpoints are not proxied by nginx, they are available inside the services network only
+app.include_router(cache.router, prefix='/internal/v1/cache', tags=['cache'])
@@ -5,7 +5,7 @@ from core import messages
 from core.config import api_settings
 from db.db_connector import DBConnector
 from pydantic import BaseModel
-from services.utils import compute_page_numbers
+from services.utils import compute_page_numbers, encode_cursor, get_source_fields
 
 
 class BaseService:
@@ -39,26 +39,48 @@ class BaseService:
             raise NotImplementedError(messages.ERROR_ES_INDEX_NAME_UNDEFINED)
         return self.default_db_source
 
+    def get_list_item_class(self, list_class: Type[PaginatedListMixin] | None = None) -> Type[BaseModel]:
+        """The pydantic class of the items of the list class."""
+        if list_class is None:
+            list_class = self.get_default_response_list_class()
+        return list_class.__fields__['data'].type_
+
     def handle_list_response(self, response_data: dict, size: int, page: int, item_class: Type[BaseModel] | None = None,
-                             list_class: Type[PaginatedListMixin] | None = None) -> PaginatedListMixin | Type[PaginatedListMixin]:
+                             list_class: Type[PaginatedListMixin] | None = None, sort: str | None = None,
+                             search_after: list | None = None) -> PaginatedListMixin | Type[PaginatedListMixin]:
         """
         Helps to paginate response.
 
         :param response_data: ElasticSearch response
         :param size: a number of instances to return.
         :param page: a page number
-        :param item_class: Pydantic class for every one item.
+        :param item_class: Pydantic class for every one item (the item class of list_class by default).
         :param list_class: Pydantic class for the list with page numbers.
+        :param sort: the sort of the list, it is encoded into the next page cursor.
+        :param search_after: is set in the cursor pagination mode. The page numbers are not computed then, the cursor
+            of the next page is returned instead.
         :return:
         """
-        if item_class is None:
-            item_class = self.get_default_response_item_class()
         if list_class is None:
             list_class = self.get_default_response_list_class()
+        if item_class is None:
+            item_class = self.get_list_item_class(list_class)
         records = response_data.get('hits', {}).get('hits', [])
         items = [item_class(**r['_source']) for r in records]
-        total = response_data.get('hits', {}).get('total', {}).get('value', 0)
-        page_numbers = compute_page_numbers(page, size, total)
+        if search_after is not None:
+            next_cursor = encode_cursor(sort, records[-1]['sort']) if len(records) == size else None
+            return list_class(data=items, next_cursor=next_cursor)
+        total = response_data.get('hits', {}).get('total', {})
+        if total.get('relation') == 'gte':
+            # the total is a lower bound, so the last page is unknown
+            page_numbers = {
+                'prev': page - 1 if page > 1 else None,
+                'next': page + 1 if len(records) == size else None,
+                'first': 1,
+                'last': None,
+            }
+        else:
+            page_numbers = compute_page_numbers(page, size, total.get('value', 0))
         return list_class(data=items, **page_numbers)
 
     async def get_by_id(self, item_id: str, source: str | None = None) -> Type[BaseModel] | None:
@@ -71,14 +93,29 @@ class BaseService:
         """
         if source is None:
             source = self.get_default_db_source()
-        data = await self.connector.get(item_id=item_id, source=source)
+        item_class = self.get_default_response_item_class()
+        data = await self.connector.get(item_id=item_id, source=source, fields=get_source_fields(item_class))
         if data is None:
             return None
-        item_class = self.get_default_response_item_class()
         return item_class(**data)
 
+    async def get_many_by_ids(self, item_ids: list[str], source: str | None = None) -> list[Type[BaseModel] | None]:
+        """
+        Returns instances by ids with one DB request.
+
+        :param item_ids: item uuids.
+        :param source: DB source (table name, index, etc...).
+        :return: found instances in the order of item_ids, None for the items not found.
+        """
+        if source is None:
+            source = self.get_default_db_source()
+        item_class = self.get_default_response_item_class()
+        data = await self.connector.mget(item_ids=item_ids, source=source, fields=get_source_fields(item_class))
+        return [item_class(**item) if item is not None else None for item in data]
+
     async def get_list(self, size: int = api_settings.default_response_page_size, page: int = 1,
-                       sort: str | None = None, source: str | None = None) -> Type[PaginatedListMixin]:
+                       sort: str | None = None, source: str | None = None,
+                       search_after: list | None = None, exact_total: bool = False) -> Type[PaginatedListMixin]:
         """
         Returns list of instances.
 
@@ -86,16 +123,23 @@ class BaseService:
         :param page: a page number
         :param sort: a comma-separated list of <field>:<direction> pairs. Note: not all field types can be sorted.
         :param source: DB source (table name, index, etc...).
+        :param search_after: the sort values from the cursor ([] - the first page), None - paginate by page numbers.
+        :param exact_total: count all records to compute the last page number.
         :return:
         """
         if source is None:
             source = self.get_default_db_source()
-        response = await self.connector.get_page(source=source, size=size, page=page, sort=sort)
-        return self.handle_list_response(response, size, page)
+        response = await self.connector.get_page(source=source, size=size, page=page, sort=sort,
+                                                 search_after=search_after, exact_total=exact_total,
+                                                 fields=get_source_fields(self.get_list_item_class()))
+        return self.handle_list_response(response, size, page, sort=sort, search_after=search_after)
 
     async def search(self, query: str | dict, size: int, page: int, sort: int,
-                     source: str | None = None) -> Type[PaginatedListMixin]:
+                     source: str | None = None, search_after: list | None = None,
+                     exact_total: bool = False) -> Type[PaginatedListMixin]:
         if source is None:
             source = self.get_default_db_source()
-        response = await self.connector.search(source=source, query=query, size=size, page=page, sort=sort)
-        return self.handle_list_response(response, size, page)
+        response = await self.connector.search(source=source, query=query, size=size, page=page, sort=sort,
+                                               search_after=search_after, exact_total=exact_total,
+                                               fields=get_source_fields(self.get_list_item_class()))
+        return self.handle_list_response(response, size, page, sort=sort, search_after=search_after)
@@ -1,51 +1,277 @@
+import asyncio
+import hashlib
+import inspect
+import math
+import random
+import string
+import time
+from collections import Counter
 from functools import wraps
-from typing import Type
+from typing import Any, Awaitable, Callable, Iterable, Type
 
+import orjson
+from api.v1.response_models import PaginatedListMixin
+from core.config import api_settings
 from pydantic import BaseModel
 from storage.base_storage import BaseStorage
-from storage.redis_storage import get_redis_storage
+from storage.lru_redis_storage import get_cache_storage
 
 
-def cache_es(Model: Type[BaseModel]):
+# the time during which only one worker refreshes the stale entry
+REFRESH_LOCK_EXPIRE = 10
+
+# hits - data was found in the cache, misses - data was requested from ES,
+# coalesced - a request waited for the same ES query instead of running a new one,
+# refreshes - the entry was refreshed in the background (it was stale or was chosen to be refreshed early)
+cache_stats = Counter(hits=0, misses=0, coalesced=0, refreshes=0)
+
+_in_flight: dict[str, asyncio.Task] = {}
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def single_flight(key: str, func: Callable[..., Awaitable], *args, **kwargs):
+    """
+    Run the coroutine function only once for all concurrent callers with the same key.
+
+    The callers that come while the function is running wait for its result. Cancelling one of the callers does not
+    cancel the shared call.
+    """
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(func(*args, **kwargs))
+        _in_flight[key] = task
+
+        def forget(done_task: asyncio.Task) -> None:
+            if _in_flight.get(key) is done_task:
+                del _in_flight[key]
+        task.add_done_callback(forget)
+    else:
+        cache_stats['coalesced'] += 1
+    return await asyncio.shield(task)
+
+
+def get_cache_stats() -> dict[str, int]:
+    return dict(cache_stats)
+
+
+def should_refresh(entry: dict, beta: float = api_settings.cache_xfetch_beta) -> bool:
+    """
+    Decide whether the cache entry should be recomputed (probabilistic early expiration, XFetch).
+
+    The entry is always refreshed after its soft expiration time. Before that it is refreshed with the probability
+    which grows when the expiration time is coming and when the entry is expensive to recompute (delta).
+    """
+    # 1 - random() is in (0, 1], so the logarithm is defined
+    early = -entry['delta'] * beta * math.log(1 - random.random())
+    return time.time() + early >= entry['expire_at']
+
+
+def run_in_background(key: str, func: Callable[..., Awaitable], *args, **kwargs) -> None:
+    """Run the coroutine function with single_flight without waiting for its result."""
+    task = asyncio.ensure_future(single_flight(key, func, *args, **kwargs))
+    # keep the reference, so the task is not garbage collected
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def make_key_builder(Model: Type[BaseModel], func: Callable) -> Callable[..., tuple[str, dict[str, Any]]]:
+    """
+    Make the function which builds the cache key for the call of func.
+
+    The arguments are bound to the signature of func with the default values filled in, so positional and keyword
+    calls get the same key. Enums are replaced by their values. The arguments are hashed, so the key length does not
+    depend on the query. The key prefix contains the namespace and the version: changing the version drops the whole
+    cache. The built key is returned with the bound arguments.
+    """
+    signature = inspect.signature(func)
+    # the method of a service: the service instance does not change the result
+    skip_first = next(iter(signature.parameters), None) == 'self'
+    prefix = f'{api_settings.cache_key_namespace}:v{api_settings.cache_key_version}:{Model.__name__}:{func.__qualname__}'
+
+    def build_key(*args, **kwargs) -> tuple[str, dict[str, Any]]:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(list(bound.arguments.items())[1 if skip_first else 0:])
+        # orjson serializes enums by their values
+        raw_arguments = orjson.dumps(arguments, default=str, option=orjson.OPT_SORT_KEYS)
+        return f'{prefix}:{hashlib.blake2b(raw_arguments, digest_size=16).hexdigest()}', arguments
+    return build_key
+
+
+def tag_key(tag: str) -> str:
+    """The key of the sorted set with all cache keys of the tag (scored by their expiration time)."""
+    return f'{api_settings.cache_key_namespace}:tags:{tag}'
+
+
+def format_tags(templates: Iterable[str], values: dict[str, Any]) -> list[str]:
+    """
+    Fill the tag templates ('film:{film_id}') with the values.
+
+    The templates which refer to a missing or None value are skipped.
+    """
+    tags = []
+    for template in templates:
+        names = [name for _, name, _, _ in string.Formatter().parse(template) if name]
+        if any(values.get(name) is None for name in names):
+            continue
+        tags.append(template.format_map(values))
+    return tags
+
+
+def get_items(data: BaseModel | list[BaseModel]) -> list[BaseModel]:
+    """The items of the list response, the response itself otherwise."""
+    if isinstance(data, PaginatedListMixin):
+        return data.data
+    if type(data) is list:
+        return data
+    return [data]
+
+
+async def invalidate_tags(tags: list[str]) -> int:
+    """
+    Delete all cached responses marked by any of the tags in all workers.
+
+    :param tags: the tags, e.g. 'film:<uuid>', 'index:movies'.
+    :return: the number of deleted responses.
+    """
+    keys = await get_cache_storage().invalidate_tags([tag_key(tag) for tag in tags])
+    return len(keys)
+
+
+def to_raw_json(data_for_redis: str | list[str]) -> bytes:
+    """Join the JSON documents kept in the cache into the response body."""
+    if type(data_for_redis) is list:
+        return f'[{",".join(data_for_redis)}]'.encode()
+    return data_for_redis.encode()
+
+
+def cache_es(Model: Type[BaseModel], tags: Iterable[str] = (), item_tag: str | None = None):
     """
     Кеширование ответов от Elasticsearch запрошенных с одинаковыми параметрами.
 
     Model - модель pydantic, используется для валидирования данних из redis.
     Функция декоратор оборачивает функции возвращающие типы BaseModel и
     List[BaseModel]
-    данные в redis хранятся по ключу Model.__name__/args[]&(kwargs[])
+    данные в redis хранятся по ключу namespace:vversion:Model.__name__:func.__qualname__:hash(аргументов)
+    вместе со временем мягкого истечения (expire_at) и временем вычисления (delta).
+    После мягкого истечения устаревшие данные отдаются еще redis_cache_stale_expire секунд,
+    пока одна фоновая задача их обновляет (stale-while-revalidate). Часто запрашиваемые
+    ключи обновляются заранее с вероятностью, растущей к expire_at (XFetch).
+    Данные хранятся в виде готового JSON ответа (с алиасами полей). Если обернутая функция
+    вызвана с raw=True, то возвращаются байты этого JSON без валидации моделью pydantic.
+    tags - шаблоны тегов записи, заполняются аргументами функции ('film:{film_id}', 'index:movies'),
+    item_tag - шаблон тега, заполняется полями каждого элемента ответа ('film:{id}').
+    По тегу все записи удаляются функцией invalidate_tags.
     """
     def func_wrapper(func):
-        # в качестве хранилища выбран redis
-        storage: BaseStorage = get_redis_storage()
+        # в качестве хранилища выбран redis (с локальным LRU кешем перед ним, если он включен)
+        storage: BaseStorage = get_cache_storage()
+        build_key = make_key_builder(Model, func)
+
+        async def save_data(qry: str, arguments: dict[str, Any], data_es, delta: float) -> str | list[str]:
+            # Сохраняем фильм в кеш в том виде, в котором он отдается клиенту
+            if type(data_es) is list:
+                data_for_redis = [data.json(by_alias=True) for data in data_es]
+            else:
+                data_for_redis = data_es.json(by_alias=True)
+            entry = {
+                'data': data_for_redis,
+                'expire_at': time.time() + api_settings.redis_cache_expire,
+                'delta': delta,
+            }
+            expire = api_settings.redis_cache_expire + api_settings.redis_cache_stale_expire
+            await storage.save_data(qry, entry, expire)
+            entry_tags = format_tags(tags, arguments)
+            if item_tag is not None:
+                entry_tags += [item_tag.format_map(item.__dict__) for item in get_items(data_es)]
+            await storage.add_tags(qry, [tag_key(tag) for tag in entry_tags], expire)
+            return data_for_redis
+
+        async def load_data(qry: str, arguments: dict[str, Any], *args, **kwargs):
+            started = time.monotonic()
+            data_es = await func(*args, **kwargs)
+            delta = time.monotonic() - started
+            if data_es is None:
+                # Если он отсутствует в ES, значит, фильма нет в БД
+                return None, None
+            return data_es, await save_data(qry, arguments, data_es, delta)
+
+        async def refresh_data(qry: str, arguments: dict[str, Any], *args, **kwargs):
+            # только один воркер обновляет устаревшие данные
+            if not await storage.acquire_lock(f'{qry}:refresh', REFRESH_LOCK_EXPIRE):
+                return
+            cache_stats['refreshes'] += 1
+            await load_data(qry, arguments, *args, **kwargs)
 
         @wraps(func)
-        async def inner(*args, **kwargs):
-            arg_count = len(args)
-            qry = f'{Model.__name__}/'
-            for i in range(1, arg_count):
-                qry += f'{args[i]}&'
-            for k in kwargs:
-                qry += f'{kwargs[k]}&'
+        async def inner(*args, raw: bool = False, **kwargs):
+            qry, arguments = build_key(*args, **kwargs)
             # Читаем данние из кеша
-            data_from_redis = await storage.retrieve_data(qry)
-            if not data_from_redis:
-                # Если данных нет в кеше, то вызываем функцию
-                data_es = await func(*args, **kwargs)
-                if data_es is None:
-                    # Если он отсутствует в ES, значит, фильма нет в БД
-                    return None
-                # Сохраняем фильм в кеш
-                if type(data_es) is list:
-                    data_for_redis = [data.json() for data in data_es]
-                else:
-                    data_for_redis = data_es.json()
-                await storage.save_data(qry, data_for_redis)
+            entry = await storage.retrieve_data(qry)
+            if not isinstance(entry, dict):
+                # Если данных нет в кеше, то вызываем функцию.
+                # Одновременные запросы с тем же ключом ждут один запрос к ES
+                cache_stats['misses'] += 1
+                data_es, data_for_redis = await single_flight(qry, load_data, qry, arguments, *args, **kwargs)
+                if raw and data_for_redis is not None:
+                    return to_raw_json(data_for_redis)
                 return data_es
+            cache_stats['hits'] += 1
+            if should_refresh(entry):
+                # the refresh has its own key, so a miss never waits for a refresh which did not get the lock
+                run_in_background(f'{qry}:refresh', refresh_data, qry, arguments, *args, **kwargs)
+            data_from_redis = entry['data']
+            if raw:
+                return to_raw_json(data_from_redis)
             if type(data_from_redis) is list:
                 model_data = [Model.parse_raw(data) for data in data_from_redis]
             else:
                 model_data = Model.parse_raw(data_from_redis)
             return model_data
+        # cache_es_many reads and writes the same entries
+        inner.build_key = build_key
+        inner.save_data = save_data
+        return inner
+    return func_wrapper
+
+
+def cache_es_many(Model: Type[BaseModel], cached_get_by_id: Callable):
+    """
+    Кеширование пакетного получения записей по списку uuid.
+
+    Обернутая функция получает список uuid и возвращает список записей (None для ненайденных) в том же порядке.
+    Записи хранятся по тем же ключам, что и ответы cached_get_by_id (функции, обернутой cache_es), поэтому
+    все записи читаются одним MGET, а из ES запрашиваются только промахи одним вызовом функции.
+    Устаревшие записи считаются промахами. Возвращается список найденных записей, с raw=True - байты JSON списка.
+    """
+    def func_wrapper(func):
+        storage: BaseStorage = get_cache_storage()
+
+        @wraps(func)
+        async def inner(service, item_ids: list[str], *args, raw: bool = False, **kwargs):
+            keys = [cached_get_by_id.build_key(service, item_id, *args, **kwargs) for item_id in item_ids]
+            entries = await storage.retrieve_many([qry for qry, _ in keys])
+            now = time.time()
+            results: list[str | None] = [None] * len(item_ids)
+            missed = []
+            for i, entry in enumerate(entries):
+                if isinstance(entry, dict) and entry['expire_at'] > now:
+                    results[i] = entry['data']
+                else:
+                    missed.append(i)
+            cache_stats['hits'] += len(item_ids) - len(missed)
+            cache_stats['misses'] += len(missed)
+            if missed:
+                started = time.monotonic()
+                data_es = await func(service, [item_ids[i] for i in missed], *args, **kwargs)
+                delta = time.monotonic() - started
+                found = [(i, data) for i, data in zip(missed, data_es) if data is not None]
+                saved = await asyncio.gather(*(cached_get_by_id.save_data(*keys[i], data, delta) for i, data in found))
+                for (i, _), data_for_redis in zip(found, saved):
+                    results[i] = data_for_redis
+            results = [data for data in results if data is not None]
+            if raw:
+                return to_raw_json(results)
+            return [Model.parse_raw(data) for data in results]
         return inner
     return func_wrapper
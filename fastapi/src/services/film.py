@@ -1,8 +1,9 @@
 from api.v1.response_models import FilmResponse, FilmsListResponse
 from models.film import Film
 from services.base import BaseService
-from services.cache import cache_es
+from services.cache import cache_es, cache_es_many
 from services.genre import GenreService
+from services.genre_names import get_genre_names
 
 
 class FilmService(BaseService):
@@ -10,28 +11,39 @@ class FilmService(BaseService):
     default_response_list_class = FilmsListResponse
     default_db_source = 'movies'
 
-    @cache_es(FilmResponse)
+    @cache_es(FilmResponse, tags=('index:movies',), item_tag='film:{id}')
     async def get_by_id(self, film_id: str, source: str | None = None) -> Film | None:
         """Поиск по uuid фильма."""
         return await super().get_by_id(film_id, source)
 
-    @cache_es(FilmsListResponse)
+    @cache_es_many(FilmResponse, get_by_id)
+    async def get_many_by_ids(self, film_ids: list[str], source: str | None = None) -> list[FilmResponse | None]:
+        """Поиск по списку uuid фильмов."""
+        return await super().get_many_by_ids(film_ids, source)
+
+    @cache_es(FilmsListResponse, tags=('index:movies',), item_tag='film:{id}')
     async def search(self, query: str, page: int, size: int, sort: str,
-                     source: str | None = None) -> FilmsListResponse | None:
+                     source: str | None = None, search_after: list | None = None,
+                     exact_total: bool = False) -> FilmsListResponse | None:
         """Поиск по title фильма."""
         search_query = {'match': {'title': {'query': query}}}
-        return await super().search(search_query, size, page, sort, source)
+        return await super().search(search_query, size, page, sort, source, search_after, exact_total)
 
-    @cache_es(FilmsListResponse)
+    @cache_es(FilmsListResponse, tags=('index:movies', 'genre:{filter}'), item_tag='film:{id}')
     async def get_list(self, sort: str, filter: str | None, page: int, size: int,
-                       source: str | None = None) -> FilmsListResponse | None:
+                       source: str | None = None, search_after: list | None = None,
+                       exact_total: bool = False) -> FilmsListResponse | None:
         """Поиск по жанру фильма и сортировка."""
         if filter is not None:
-            genre_service = GenreService(self.connector)
-            genre = await genre_service.get_by_id(filter)
-            if genre is None:
-                return None
-            query = {'match': {'genre': {'query': genre.name}}}
+            genre_name = get_genre_names().get(filter)
+            if genre_name is None:
+                # the genre was added after the last load of the genre names
+                genre = await GenreService(self.connector).get_by_id(filter)
+                if genre is None:
+                    return None
+                genre_name = genre.name
+            # the genre is a keyword field, the filter context is not scored and is cached by ES
+            query = {'bool': {'filter': {'term': {'genre': genre_name}}}}
         else:
             query = {'match_all': {}}
-        return await super().search(query, size, page, sort, source)
+        return await super().search(query, size, page, sort, source, search_after, exact_total)
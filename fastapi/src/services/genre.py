@@ -1,7 +1,7 @@
 from api.v1.response_models import GenreListResponse, GenreResponse
 from core.config import api_settings
 from services.base import BaseService
-from services.cache import cache_es
+from services.cache import cache_es, cache_es_many
 
 
 class GenreService(BaseService):
@@ -9,11 +9,16 @@ class GenreService(BaseService):
     default_response_list_class = GenreListResponse
     default_db_source = 'genres'
 
-    @cache_es(GenreResponse)
+    @cache_es(GenreResponse, tags=('index:genres',), item_tag='genre:{id}')
     async def get_by_id(self, genre_id: str, source: str | None = None) -> GenreResponse | None:
         return await super().get_by_id(genre_id, source)
 
-    @cache_es(GenreListResponse)
+    @cache_es_many(GenreResponse, get_by_id)
+    async def get_many_by_ids(self, genre_ids: list[str], source: str | None = None) -> list[GenreResponse | None]:
+        return await super().get_many_by_ids(genre_ids, source)
+
+    @cache_es(GenreListResponse, tags=('index:genres',), item_tag='genre:{id}')
     async def get_list(self, size: int = api_settings.default_response_page_size, page: int = 0,
-                       sort: str | None = None, source: str | None = None) -> GenreListResponse:
-        return await super().get_list(size, page, sort, source)
+                       sort: str | None = None, source: str | None = None,
+                       search_after: list | None = None, exact_total: bool = False) -> GenreListResponse:
+        return await super().get_list(size, page, sort, source, search_after, exact_total)
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+
+from core.config import api_settings
+from db.db_connector import DBConnector, get_db_connector
+from services.genre import GenreService
+
+
+logger = logging.getLogger(__name__)
+
+
+class GenreNames:
+    """
+    In-process map of genre ids to genre names.
+
+    There are few genres, so the whole index is loaded at startup and reloaded periodically. Until the map is loaded,
+    or for a genre added after the last reload, get returns None.
+    """
+    # more genres than ES returns in one page are not expected
+    MAX_GENRES = 10000
+
+    def __init__(self):
+        self._names: dict[str, str] = {}
+        self._task: asyncio.Task | None = None
+
+    def get(self, genre_id: str) -> str | None:
+        return self._names.get(genre_id)
+
+    async def load(self, connector: DBConnector) -> None:
+        response = await connector.get_page(source=GenreService.default_db_source, size=self.MAX_GENRES, page=1,
+                                             sort=None, fields=['id', 'name'])
+        records = response.get('hits', {}).get('hits', [])
+        self._names = {r['_source']['id']: r['_source']['name'] for r in records}
+        logger.info('Genre names are loaded: %s genres', len(self._names))
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.load(get_db_connector())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Genre names loading failed')
+            await asyncio.sleep(api_settings.genre_names_refresh_interval)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+genre_names = GenreNames()
+
+
+def get_genre_names() -> GenreNames:
+    """interface and genre names connectivity."""
+    return genre_names
@@ -1,28 +1,38 @@
 from api.v1.response_models import (FilmShortListResponse, FilmShortResponse,
-                                    PersonListResponse, PersonResponse)
+                                    FilmSortSelection, PersonListResponse,
+                                    PersonResponse)
 from core.config import api_settings
 from services.base import BaseService
-from services.cache import cache_es
+from services.cache import cache_es, cache_es_many
 from services.film import FilmService
+from services.utils import get_source_fields
 
 
 class PersonService(BaseService):
     default_response_item_class = PersonResponse
     default_response_list_class = PersonListResponse
     default_db_source = 'persons'
+    # the nested fields of the movies index with the ids of the persons
+    FILM_ROLES = ('actors', 'writers')
 
-    @cache_es(PersonResponse)
+    @cache_es(PersonResponse, tags=('index:persons',), item_tag='person:{id}')
     async def get_by_id(self, person_id: str, source: str | None = None) -> PersonResponse | None:
         return await super().get_by_id(person_id, source)
 
-    @cache_es(PersonListResponse)
+    @cache_es_many(PersonResponse, get_by_id)
+    async def get_many_by_ids(self, person_ids: list[str], source: str | None = None) -> list[PersonResponse | None]:
+        return await super().get_many_by_ids(person_ids, source)
+
+    @cache_es(PersonListResponse, tags=('index:persons',), item_tag='person:{id}')
     async def get_list(self, size: int = api_settings.default_response_page_size, page: int = 1,
-                       sort: str | None = None, source: str | None = None) -> PersonListResponse:
-        return await super().get_list(size, page, sort, source)
+                       sort: str | None = None, source: str | None = None,
+                       search_after: list | None = None, exact_total: bool = False) -> PersonListResponse:
+        return await super().get_list(size, page, sort, source, search_after, exact_total)
 
-    @cache_es(FilmShortListResponse)
-    async def get_person_films(self, person_id: str, size: int = api_settings.default_response_page_size, page: int = 0,
-                               sort: str = 'imdb_rating:desc') -> FilmShortListResponse | None:
+    @cache_es(FilmShortListResponse, tags=('index:movies', 'person:{person_id}'), item_tag='film:{id}')
+    async def get_person_films(self, person_id: str, size: int = api_settings.default_response_page_size, page: int = 1,
+                               sort: str | None = None, search_after: list | None = None,
+                               exact_total: bool = False) -> FilmShortListResponse | None:
         """
         Returns films in which the person with the person_id UUID participated.
 
@@ -30,54 +40,39 @@ class PersonService(BaseService):
         :param size: the film number per page
         :param page: the page number
         :param sort: a comma-separated list of <field>:<direction> pairs. Note: not all field types can be sorted.
+        :param search_after: the sort values from the cursor ([] - the first page), None - paginate by page numbers.
+        :param exact_total: count all films found to compute the last page number.
         :return: the list of films and page numbers for pagination
         """
         person = await self.get_by_id(person_id)
-        # persons = await self.get_list()
         if not person:
             return None
+        if sort is None:
+            sort = FilmSortSelection.rating_desc.value
+        # the filter context does not score the films and is cached by ES
         search_query = {
             'bool': {
-                'must': [
-                    {'query_string': {'query': f'"{person.full_name}"'}}
-                ],
-                'should': [
-                    {'nested': {'path': 'actors', 'query': {"match": {'actors.id': person_id}}}},
-                    {'nested': {'path': 'writers', 'query': {"match": {'writers.id': person_id}}}},
-                ]
-            }
-        }
-        film_service = FilmService(self.connector)
-        response = await film_service.search(search_query, size, page, sort)
-        return self.handle_list_response(response, size, page, FilmShortResponse, FilmShortListResponse)
-
-        offset = (page - 1) * size
-        person = await self.get_by_id(person_id)
-        if not person:
-            return None
-        response = await self.elastic.search(
-            index='movies',
-            body={
-                'query': {
+                'filter': {
                     'bool': {
-                        'must': [
-                            {'query_string': {'query': f'"{person.full_name}"'}}
-                        ],
                         'should': [
-                            {'nested': {'path': 'actors', 'query': {"match": {'actors.id': person_id}}}},
-                            {'nested': {'path': 'writers', 'query': {"match": {'writers.id': person_id}}}},
-                        ]
-                    }},
-                'from': offset,
-                'size': size
-            },
-            sort=sort
-        )
-        return self.handle_list_response(response, size, page, FilmShortResponse, FilmShortListResponse)
+                            {'nested': {'path': role, 'query': {'term': {f'{role}.id': person_id}}}}
+                            for role in self.FILM_ROLES
+                        ],
+                        'minimum_should_match': 1,
+                    }
+                }
+            }
+        }
+        response = await self.connector.search(source=FilmService.default_db_source, query=search_query, size=size,
+                                               page=page, sort=sort, search_after=search_after,
+                                               exact_total=exact_total, fields=get_source_fields(FilmShortResponse))
+        return self.handle_list_response(response, size, page, FilmShortResponse, FilmShortListResponse, sort=sort,
+                                         search_after=search_after)
 
-    @cache_es(PersonResponse)
+    @cache_es(PersonListResponse, tags=('index:persons',), item_tag='person:{id}')
     async def search(self, query: str, size: int = api_settings.default_response_page_size, page: int = 1,
-                     sort: str = 'full_name:asc', source: str | None = None) -> PersonListResponse:
+                     sort: str = 'full_name:asc', source: str | None = None,
+                     search_after: list | None = None, exact_total: bool = False) -> PersonListResponse:
         """
         Search for persons by full_name field.
 
@@ -86,7 +81,9 @@ class PersonService(BaseService):
         :param page: the page number
         :param sort: a comma-separated list of <field>:<direction> pairs. Note: not all field types can be sorted.
         :param source: DB source (table name, index, etc...).
+        :param search_after: the sort values from the cursor ([] - the first page), None - paginate by page numbers.
+        :param exact_total: count all persons found to compute the last page number.
         :return: persons found
         """
         search_query = {'match': {'full_name': {'query': query}}}
-        return await super().search(search_query, size, page, sort, source)
+        return await super().search(search_query, size, page, sort, source, search_after, exact_total)
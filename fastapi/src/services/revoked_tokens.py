@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import logging
+import time
+
+import aioredis
+import orjson
+from aioredis import Redis
+from core.config import api_settings
+from db.auth_grpc import get_auth_grpc_channel
+from grpc_control import tokens_control_pb2, tokens_control_pb2_grpc
+
+
+logger = logging.getLogger(__name__)
+
+# the auth service keeps the revoked jti in sets 'jtiBlock:<hour>', one set per hour of the token expiration time
+REVOKED_BUCKET_PREFIX = 'jtiBlock:'
+REVOKED_BUCKET_SECONDS = 3600
+
+
+class RevokedTokens:
+    """
+    In-process set of revoked token identifiers (jti).
+
+    Every jti is kept until its expiration time, after that it is evicted. Until the set is synchronized with the
+    auth service, all tokens are treated as revoked.
+    """
+    def __init__(self):
+        self._expire_at: dict[str, float] = {}
+        self._expire_queue: list[tuple[float, str]] = []
+        self.is_synced = False
+
+    def add(self, jti: str, expire_at: float) -> None:
+        """Add the jti to the set until expire_at (unix timestamp)."""
+        if expire_at <= self._expire_at.get(jti, 0):
+            return
+        self._expire_at[jti] = expire_at
+        heapq.heappush(self._expire_queue, (expire_at, jti))
+        self._evict_expired()
+
+    def is_revoked(self, jti: str) -> bool:
+        if not self.is_synced:
+            return True
+        expire_at = self._expire_at.get(jti)
+        if expire_at is None:
+            return False
+        if expire_at <= time.time():
+            self._evict_expired()
+            return False
+        return True
+
+    def _evict_expired(self) -> None:
+        now = time.time()
+        while self._expire_queue and self._expire_queue[0][0] <= now:
+            expire_at, jti = heapq.heappop(self._expire_queue)
+            if self._expire_at.get(jti) == expire_at:
+                del self._expire_at[jti]
+
+    def __len__(self) -> int:
+        return len(self._expire_at)
+
+
+class RevocationListener:
+    """
+    Keeps RevokedTokens in sync with the auth service.
+
+    The listener subscribes to the revocation channel of the auth Redis (or to the revocation stream of the auth gRPC
+    server) and then loads the snapshot of already revoked tokens, so no revocation is lost between them. On a
+    connection error the set is marked as not synced and the listener reconnects.
+    """
+    def __init__(self, revoked_tokens: RevokedTokens):
+        self.revoked_tokens = revoked_tokens
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        listen = self._listen_grpc if api_settings.revoked_tokens_source == 'grpc' else self._listen_redis
+        while True:
+            try:
+                await listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Revoked tokens listener failed')
+            finally:
+                self.revoked_tokens.is_synced = False
+            await asyncio.sleep(api_settings.revoked_tokens_reconnect_delay)
+
+    async def _listen_redis(self) -> None:
+        address = (api_settings.auth_redis_host, api_settings.auth_redis_port)
+        # the pool gives a dedicated connection to the subscription and another one to the snapshot loading
+        redis = await aioredis.create_redis_pool(address, minsize=1, maxsize=2)
+        try:
+            channel, = await redis.subscribe(api_settings.revoked_tokens_channel)
+            await self._load_snapshot(redis)
+            self._set_synced()
+            while await channel.wait_message():
+                self._handle_message(await channel.get())
+        finally:
+            redis.close()
+            await redis.wait_closed()
+
+    async def _listen_grpc(self) -> None:
+        # the auth service subscribes before it sends the snapshot and marks the end of the snapshot
+        stub = tokens_control_pb2_grpc.TokensControlStub(get_auth_grpc_channel())
+        stream = stub.WatchRevocations(tokens_control_pb2.WatchRequest(with_snapshot=True))
+        try:
+            async for revoked_token in stream:
+                if revoked_token.snapshot_end:
+                    self._set_synced()
+                else:
+                    self.revoked_tokens.add(revoked_token.jti, revoked_token.exp)
+        finally:
+            stream.cancel()
+
+    def _set_synced(self) -> None:
+        self.revoked_tokens.is_synced = True
+        logger.info('Revoked tokens are synced: %s tokens', len(self.revoked_tokens))
+
+    async def _load_snapshot(self, redis: Redis) -> None:
+        now = time.time()
+        async for key in redis.iscan(match=f'{REVOKED_BUCKET_PREFIX}*', count=100):
+            # the tokens of the bucket expire before the end of its hour
+            expire_at = (int(key.decode()[len(REVOKED_BUCKET_PREFIX):]) + 1) * REVOKED_BUCKET_SECONDS
+            if expire_at <= now:
+                continue
+            async for jti in redis.isscan(key, count=1000):
+                self.revoked_tokens.add(jti.decode(), expire_at)
+
+    def _handle_message(self, message: bytes) -> None:
+        try:
+            data = orjson.loads(message)
+            self.revoked_tokens.add(data['jti'], data['exp'])
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning('Wrong revoked token message: %s', message)
+
+
+revoked_tokens = RevokedTokens()
+revocation_listener = RevocationListener(revoked_tokens)
+
+
+def get_revoked_tokens() -> RevokedTokens:
+    """interface and revoked tokens connectivity."""
+    return revoked_tokens
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+
+import httpx
+from core.config import api_settings
+from db.auth_grpc import get_auth_grpc_channel
+from grpc import aio
+from grpc_control import tokens_control_pb2, tokens_control_pb2_grpc
+from models.auth import IsTokenCompromised, TokenData
+from pydantic import ValidationError
+from storage.lru_redis_storage import LocalLRUCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCheckFailed(Exception):
+    """The auth service did not check the token."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling the failing service.
+
+    After max_failures failures in a row the circuit is open: no calls are allowed for reset_timeout seconds. Then one
+    trial call is allowed, its success closes the circuit, its failure opens it again.
+    """
+    def __init__(self, max_failures: int, reset_timeout: float):
+        self.max_failures = max_failures
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return False
+        # half-open: let the trial call pass and wait for its result
+        self._opened_at = time.monotonic()
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self.max_failures:
+            self._opened_at = time.monotonic()
+
+
+class RemoteTokenChecker(ABC):
+    """
+    Checks tokens by the auth service.
+
+    The tokens which are not compromised are cached for a short time, but not longer than the token lives. When the
+    auth service fails or does not respond in time, the token is treated as compromised.
+    """
+    def __init__(self):
+        self.breaker = CircuitBreaker(api_settings.token_check_breaker_failures,
+                                      api_settings.token_check_breaker_reset_timeout)
+        # every jti is stored with the size 1, so the size limit equals the items limit
+        self._not_compromised = LocalLRUCache(api_settings.token_check_cache_max_items,
+                                              api_settings.token_check_cache_max_items)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def is_revoked(self, token: str, token_data: TokenData) -> bool:
+        if self._not_compromised.get(token_data.jti):
+            return False
+        if not self.breaker.allow():
+            return True
+        try:
+            is_compromised = await self._check(token, token_data)
+        except TokenCheckFailed:
+            logger.warning('The auth service did not check the token', exc_info=True)
+            self.breaker.record_failure()
+            return True
+        self.breaker.record_success()
+        if not is_compromised:
+            ttl = min(api_settings.token_check_cache_ttl, token_data.exp - time.time())
+            self._not_compromised.set(token_data.jti, True, 1, ttl)
+        return is_compromised
+
+    @abstractmethod
+    async def _check(self, token: str, token_data: TokenData) -> bool:
+        """Ask the auth service whether the token is compromised. Raise TokenCheckFailed if the service fails."""
+
+
+class HttpTokenChecker(RemoteTokenChecker):
+    """The HTTP connections are kept alive and shared by all requests."""
+    def __init__(self):
+        super().__init__()
+        self.client: httpx.AsyncClient | None = None
+
+    async def start(self) -> None:
+        limits = httpx.Limits(max_connections=api_settings.token_check_max_connections,
+                              max_keepalive_connections=api_settings.token_check_max_connections)
+        self.client = httpx.AsyncClient(limits=limits, timeout=api_settings.token_check_timeout)
+
+    async def stop(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def _check(self, token: str, token_data: TokenData) -> bool:
+        if self.client is None:
+            raise TokenCheckFailed('The HTTP client is not started')
+        try:
+            response = await self.client.get(api_settings.check_token_is_compromised_url,
+                                             params={'access_token': token})
+        except httpx.HTTPError as error:
+            raise TokenCheckFailed(str(error))
+        if response.status_code >= httpx.codes.INTERNAL_SERVER_ERROR:
+            raise TokenCheckFailed(f'The auth service responded {response.status_code}')
+        try:
+            return IsTokenCompromised(**response.json()).is_compromised
+        except (ValueError, TypeError, ValidationError):
+            # the auth service rejected the token
+            return True
+
+
+class GrpcTokenChecker(RemoteTokenChecker):
+    """
+    The tokens are checked over the persistent gRPC channel.
+
+    The tokens checked concurrently (in the same iteration of the event loop) are sent in one CheckTokens call.
+    """
+    def __init__(self):
+        super().__init__()
+        # jti -> the result of the check and the token expiration time
+        self._pending: dict[str, tuple[asyncio.Future, int]] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    async def _check(self, token: str, token_data: TokenData) -> bool:
+        future, _ = self._pending.get(token_data.jti, (None, None))
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[token_data.jti] = future, int(token_data.exp)
+            if self._flush_task is None:
+                self._flush_task = asyncio.ensure_future(self._flush())
+                self._flush_task.add_done_callback(self._fail_unflushed)
+        return await asyncio.shield(future)
+
+    async def _flush(self) -> None:
+        # let the other requests of this loop iteration join the batch
+        await asyncio.sleep(0)
+        pending = self._take_pending()
+        try:
+            statuses = await self._check_tokens(list(pending), [exp for _, exp in pending.values()])
+        except BaseException as error:
+            # every waiting request must get an answer, whatever stopped the batch
+            failure = error
+            if not isinstance(error, TokenCheckFailed):
+                failure = TokenCheckFailed(f'The token check failed: {error!r}')
+            self._fail(pending, failure)
+            if not isinstance(error, Exception):
+                # the cancellation goes on
+                raise
+            return
+        for (future, _), is_compromised in zip(pending.values(), statuses):
+            if not future.done():
+                future.set_result(is_compromised)
+
+    def _fail_unflushed(self, task: asyncio.Task) -> None:
+        # the flush task was cancelled before it took the batch
+        if self._flush_task is task:
+            self._fail(self._take_pending(), TokenCheckFailed('The token check was cancelled'))
+
+    def _take_pending(self) -> dict[str, tuple[asyncio.Future, int]]:
+        pending, self._pending, self._flush_task = self._pending, {}, None
+        return pending
+
+    @staticmethod
+    def _fail(pending: dict[str, tuple[asyncio.Future, int]], error: TokenCheckFailed) -> None:
+        for future, _ in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def _check_tokens(self, jtis: list[str], exps: list[int]) -> list[bool]:
+        channel = get_auth_grpc_channel()
+        if channel is None:
+            raise TokenCheckFailed('The gRPC channel is not opened')
+        stub = tokens_control_pb2_grpc.TokensControlStub(channel)
+        try:
+            response = await stub.CheckTokens(tokens_control_pb2.TokenIds(jti=jtis, exp=exps),
+                                              timeout=api_settings.token_check_timeout)
+        except aio.AioRpcError as error:
+            raise TokenCheckFailed(error.details())
+        if len(response.is_compromised) != len(jtis):
+            raise TokenCheckFailed('The auth service returned a wrong number of statuses')
+        return list(response.is_compromised)
+
+
+token_checkers = {
+    'remote': HttpTokenChecker,
+    'grpc': GrpcTokenChecker,
+}
+token_checker: RemoteTokenChecker = token_checkers.get(api_settings.token_check_mode, HttpTokenChecker)()
+
+
+def get_token_checker() -> RemoteTokenChecker:
+    """interface and token checker connectivity."""
+    return token_checker
@@ -1,6 +1,13 @@
+import base64
+import binascii
+from enum import Enum
+from functools import lru_cache
 from math import ceil
+from typing import Type
 
+import orjson
 from core import messages
+from pydantic import BaseModel
 
 
 def compute_page_numbers(current_page: int, records_per_page: int, total_records: int, start_from_zero: bool = False,
@@ -43,3 +50,54 @@ def compute_page_numbers(current_page: int, records_per_page: int, total_records
     prev_page = current_page - 1 if current_page > first_page else None
     next_page = current_page + 1 if current_page < last_page else None
     return {'prev': prev_page, 'next': next_page, 'first': first_page, 'last': last_page}
+
+
+def _sort_value(sort: str | Enum | None) -> str | None:
+    return sort.value if isinstance(sort, Enum) else sort
+
+
+def encode_cursor(sort: str | Enum | None, search_after: list) -> str:
+    """
+    Encode the sort values of the last record of the page into the opaque cursor of the next page.
+
+    :param sort: the sort of the list, the cursor is valid only for the same sort.
+    :param search_after: the sort values of the last record.
+    :return: the cursor.
+    """
+    raw_cursor = orjson.dumps({'sort': _sort_value(sort), 'after': search_after})
+    return base64.urlsafe_b64encode(raw_cursor).decode()
+
+
+def decode_cursor(cursor: str, sort: str | Enum | None) -> list:
+    """
+    Decode the cursor made by encode_cursor.
+
+    :param cursor: the cursor.
+    :param sort: the sort of the requested list.
+    :return: the sort values to search after.
+    """
+    try:
+        data = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, orjson.JSONDecodeError, ValueError):
+        raise ValueError(messages.INVALID_CURSOR)
+    if not isinstance(data, dict) or data.get('sort') != _sort_value(sort) or not isinstance(data.get('after'), list):
+        raise ValueError(messages.INVALID_CURSOR)
+    return data['after']
+
+
+@lru_cache()
+def get_source_fields(model: Type[BaseModel]) -> list[str]:
+    """
+    The fields of the DB record which are needed to build the model.
+
+    The model is built from the record by the field aliases, or by the field names if the model allows it.
+
+    :param model: the pydantic model.
+    :return: the top-level field names of the record.
+    """
+    fields = []
+    for field in model.__fields__.values():
+        fields.append(field.alias)
+        if field.name != field.alias and model.__config__.allow_population_by_field_name:
+            fields.append(field.name)
+    return fields
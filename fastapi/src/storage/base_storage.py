@@ -4,7 +4,7 @@ from abc import ABC, abstractmethod
 class BaseStorage (ABC):
 
     @abstractmethod
-    async def save_data(self, key: str, data: dict) -> None:
+    async def save_data(self, key: str, data: dict, expire: int | None = None) -> None:
         """Save state to storage."""
         pass
 
@@ -12,3 +12,23 @@ class BaseStorage (ABC):
     async def retrieve_data(self, key: str) -> dict:
         """Load state locally from storage."""
         pass
+
+    @abstractmethod
+    async def retrieve_many(self, keys: list[str]) -> list[dict | None]:
+        """Load the states of the keys in the same order, None for the missing ones."""
+        pass
+
+    @abstractmethod
+    async def acquire_lock(self, key: str, expire: int) -> bool:
+        """Acquire the lock shared by all workers. The lock is released after expire seconds."""
+        pass
+
+    @abstractmethod
+    async def add_tags(self, key: str, tags: list[str], expire: int) -> None:
+        """Add the key expiring in expire seconds to the tags. The expired keys are dropped from the tags."""
+        pass
+
+    @abstractmethod
+    async def invalidate_tags(self, tags: list[str]) -> list[str]:
+        """Delete all keys of the tags and the tags themselves. Return the deleted not expired keys."""
+        pass
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+import orjson
+from aioredis import Redis
+from core.config import api_settings
+from db.redis import get_redis_sync
+
+from .base_storage import BaseStorage
+from .redis_storage import RedisStorage, get_redis_storage
+
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLRUCache:
+    """
+    In-process LRU cache limited by the number of items and by their total size.
+
+    Every item is stored with its own expiration time.
+    """
+    def __init__(self, max_items: int, max_bytes: int):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._size = 0
+
+    def get(self, key: str) -> Any | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expire_at, _, value = item
+        if expire_at <= time.monotonic():
+            self.delete(key)
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: float) -> None:
+        if ttl <= 0 or size > self.max_bytes:
+            self.delete(key)
+            return
+        self.delete(key)
+        self._items[key] = (time.monotonic() + ttl, size, value)
+        self._size += size
+        while len(self._items) > self.max_items or self._size > self.max_bytes:
+            _, (_, evicted_size, _) = self._items.popitem(last=False)
+            self._size -= evicted_size
+
+    def delete(self, key: str) -> None:
+        item = self._items.pop(key, None)
+        if item is not None:
+            self._size -= item[1]
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class LRURedisStorage(RedisStorage):
+    """
+    Two-tier storage: in-process LRU cache in front of Redis.
+
+    Every write is published to the invalidation channel, so the other workers drop their local copies of the key.
+    The local cache is used only while the worker is subscribed to the channel.
+    """
+    def __init__(self, redis: Redis):
+        super().__init__(redis)
+        self.local_cache = LocalLRUCache(api_settings.local_cache_max_items, api_settings.local_cache_max_bytes)
+        self.worker_id = uuid.uuid4().hex
+        self._is_subscribed = False
+        self._task: asyncio.Task | None = None
+
+    async def save_data(self, key: str, data: dict, expire: int | None = None) -> None:
+        """Save state to storage."""
+        self._check_redis()
+        expire = expire or api_settings.redis_cache_expire
+        raw_data = orjson.dumps(data)
+        await self.redis.set(key, raw_data, expire=expire)
+        await self.publish_invalidation([key])
+        if self._is_subscribed:
+            self.local_cache.set(key, data, len(raw_data), min(api_settings.local_cache_ttl, expire))
+
+    async def retrieve_data(self, key: str) -> dict | None:
+        """Load state locally from storage."""
+        if self._is_subscribed:
+            data = self.local_cache.get(key)
+            if data is not None:
+                return data
+        self._check_redis()
+        pipe = self.redis.pipeline()
+        pipe.get(key)
+        pipe.pttl(key)
+        data_redis, pttl = await pipe.execute()
+        if not data_redis:
+            return None
+        data = orjson.loads(data_redis)
+        if self._is_subscribed:
+            # the local copy must not outlive the Redis one
+            ttl = api_settings.local_cache_ttl if pttl < 0 else min(api_settings.local_cache_ttl, pttl / 1000)
+            self.local_cache.set(key, data, len(data_redis), ttl)
+        return data
+
+    async def retrieve_many(self, keys: list[str]) -> list[dict | None]:
+        """Load the states from the local cache, the missing ones with one Redis round trip."""
+        results = [self.local_cache.get(key) if self._is_subscribed else None for key in keys]
+        missed = [i for i, data in enumerate(results) if data is None]
+        if not missed:
+            return results
+        self._check_redis()
+        pipe = self.redis.pipeline()
+        for i in missed:
+            pipe.get(keys[i])
+            pipe.pttl(keys[i])
+        replies = await pipe.execute()
+        for n, i in enumerate(missed):
+            data_redis, pttl = replies[2 * n], replies[2 * n + 1]
+            if not data_redis:
+                continue
+            results[i] = orjson.loads(data_redis)
+            if self._is_subscribed:
+                ttl = api_settings.local_cache_ttl if pttl < 0 else min(api_settings.local_cache_ttl, pttl / 1000)
+                self.local_cache.set(keys[i], results[i], len(data_redis), ttl)
+        return results
+
+    async def invalidate_tags(self, tags: list[str]) -> list[str]:
+        keys = await super().invalidate_tags(tags)
+        if keys:
+            for key in keys:
+                self.local_cache.delete(key)
+            await self.publish_invalidation(keys)
+        return keys
+
+    async def publish_invalidation(self, keys: list[str]) -> None:
+        """Ask the other workers to drop their local copies of the keys."""
+        message = {'worker': self.worker_id, 'keys': keys}
+        await self.redis.publish(api_settings.cache_invalidation_channel, orjson.dumps(message))
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _listen(self) -> None:
+        while True:
+            self._check_redis()
+            try:
+                channel, = await self.redis.subscribe(api_settings.cache_invalidation_channel)
+                self._is_subscribed = True
+                while await channel.wait_message():
+                    self._handle_message(await channel.get())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Cache invalidation listener failed')
+            finally:
+                # invalidations may be lost while the worker is not subscribed
+                self._is_subscribed = False
+                self.local_cache.clear()
+            await asyncio.sleep(1)
+
+    def _handle_message(self, message: bytes) -> None:
+        try:
+            data = orjson.loads(message)
+            if data['worker'] == self.worker_id:
+                return
+            for key in data['keys']:
+                self.local_cache.delete(key)
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning('Wrong cache invalidation message: %s', message)
+
+
+lru_redis_storage = LRURedisStorage(get_redis_sync())
+
+
+def get_cache_storage() -> BaseStorage:
+    """interface and cache storage connectivity."""
+    if api_settings.local_cache_enabled:
+        return lru_redis_storage
+    return get_redis_storage()
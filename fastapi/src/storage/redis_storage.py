@@ -1,3 +1,4 @@
+import time
 from typing import Type
 
 import orjson
@@ -8,29 +9,80 @@ from db.redis import get_redis_sync
 from .base_storage import BaseStorage
 
 
+# deletes the not expired keys of every tag (KEYS) and the tags themselves, returns the deleted keys;
+# ARGV[1]: the current time
+INVALIDATE_TAGS_SCRIPT = """
+local deleted = {}
+for _, tag in ipairs(KEYS) do
+    local keys = redis.call('ZRANGEBYSCORE', tag, '(' .. ARGV[1], '+inf')
+    for i = 1, #keys, 1000 do
+        redis.call('DEL', unpack(keys, i, math.min(i + 999, #keys)))
+    end
+    for _, key in ipairs(keys) do
+        table.insert(deleted, key)
+    end
+    redis.call('DEL', tag)
+end
+return deleted
+"""
+
+
 class RedisStorage(BaseStorage):
     """Saving and retrieving data in Redis database."""
     def __init__(self, redis: Redis):
         self.redis = redis
 
-    async def save_data(self, key: str, data: dict) -> None:
+    async def save_data(self, key: str, data: dict, expire: int | None = None) -> None:
         """Save state to storage."""
-        self.__check_redis()
+        self._check_redis()
         await self.redis.set(
             key,
             orjson.dumps(data),
-            expire=api_settings.redis_cache_expire
+            expire=expire or api_settings.redis_cache_expire
         )
 
     async def retrieve_data(self, key: str) -> dict | None:
         """Load state locally from storage."""
-        self.__check_redis()
+        self._check_redis()
         data_redis = await self.redis.get(key)
         if not data_redis:
             return None
         return(orjson.loads(data_redis))
 
-    def __check_redis(self) -> None:
+    async def retrieve_many(self, keys: list[str]) -> list[dict | None]:
+        if not keys:
+            return []
+        self._check_redis()
+        data_redis = await self.redis.mget(*keys)
+        return [orjson.loads(data) if data else None for data in data_redis]
+
+    async def acquire_lock(self, key: str, expire: int) -> bool:
+        self._check_redis()
+        return await self.redis.set(key, b'1', expire=expire, exist=self.redis.SET_IF_NOT_EXIST)
+
+    async def add_tags(self, key: str, tags: list[str], expire: int) -> None:
+        if not tags:
+            return
+        self._check_redis()
+        now = time.time()
+        pipe = self.redis.pipeline()
+        for tag in tags:
+            # the keys of the tag are scored by their expiration time, the expired ones are dropped on every write,
+            # so the tag does not grow with the keys which are not cached any more
+            pipe.zadd(tag, now + expire, key)
+            pipe.zremrangebyscore(tag, max=now)
+            # the keys added earlier expire earlier, so the tag outlives all of them
+            pipe.expire(tag, expire)
+        await pipe.execute()
+
+    async def invalidate_tags(self, tags: list[str]) -> list[str]:
+        if not tags:
+            return []
+        self._check_redis()
+        keys = await self.redis.eval(INVALIDATE_TAGS_SCRIPT, keys=tags, args=[time.time()])
+        return [key.decode() for key in keys]
+
+    def _check_redis(self) -> None:
         if self.redis is None:
             self.redis = get_redis_sync()
 
@@ -73,6 +73,29 @@ async def test_film_list_pagination_incorrect_pages(films_data, films_fill_data,
     assert len(response.body['data']) == 0
 
 
+@pytest.mark.asyncio
+async def test_film_list_cursor_pagination(films_data, films_fill_data, make_get_request, redis_clean):
+    page_size = 3
+    film_ids = []
+    cursor = ''
+    while cursor is not None:
+        response = await make_get_request('/films', params={'size': page_size, 'cursor': cursor})
+        assert response.status == HTTPStatus.OK
+        assert response.body['prev'] is None
+        assert response.body['last'] is None
+        assert len(response.body['data']) <= page_size
+        film_ids += [film['id'] for film in response.body['data']]
+        cursor = response.body['next_cursor']
+
+    assert sorted(film_ids) == sorted(film.id for film in films_data)
+
+    # The cursor made for another sort
+    response = await make_get_request('/films', params={'size': page_size, 'cursor': ''})
+    cursor = response.body['next_cursor']
+    response = await make_get_request('/films', params={'size': page_size, 'cursor': cursor, 'sort': 'imdb_rating:asc'})
+    assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_film_filtered(films_data, films_fill_data, make_get_request, redis_clean,
                              genres_data, genres_fill_data):
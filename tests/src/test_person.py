@@ -90,3 +90,25 @@ async def test_person_search(persons_data, persons_fill_data, make_get_request,
     response = await make_get_request('/persons/search', params={'query': 'Vasily'})
     assert response.status == HTTPStatus.OK
     assert len(response.body['data']) == 0
+
+
+@pytest.mark.asyncio
+async def test_person_films(films_data, films_fill_data, persons_data, persons_fill_data, es_client,
+                            make_get_request, redis_clean):
+    # The person without films
+    response = await make_get_request(f'/persons/{persons_data[0].id}/film')
+    assert response.status == HTTPStatus.OK
+    assert len(response.body['data']) == 0
+
+    # The actor of all films
+    actor = films_data[0].actors[0]
+    await es_client.index(index='persons', id=actor.id, body={'id': actor.id, 'full_name': actor.name},
+                          refresh='wait_for')
+    response = await make_get_request(f'/persons/{actor.id}/film', params={'size': len(films_data)})
+    assert response.status == HTTPStatus.OK
+    ratings = [film['imdb_rating'] for film in response.body['data']]
+    assert len(ratings) == len(films_data)
+    assert ratings == sorted(ratings, reverse=True)
+
+    response = await make_get_request('/persons/00000000-0000-0000-0000-000000000/film')
+    assert response.status == HTTPStatus.NOT_FOUND
@@ -334,3 +334,61 @@ async def test_not_superuser_cannot_revoke_role(make_request, get_user_with_test
     actual = response.status
     expected = HTTPStatus.FORBIDDEN
     assert actual == expected, f'Expected status {expected} but got {actual}'
+
+
+# BULK PROVIDE AND REVOKE ROLE
+
+async def test_superuser_can_provide_role_to_users(make_request, get_user, get_superuser_access_token, get_user_role,
+                                                   clear_test_data):
+    """
+    Test: POST /auth/roles/provide-bulk/ endpoint - superuser can provide role to several users, unknown users
+    and users who already have the role are skipped.
+    """
+    body = {'user_ids': [str(get_user.id), '00000000-0000-0000-0000-000000000000'],
+            'role_id': str(get_user_role.id)}
+    headers = {'Authorization': f'Bearer {get_superuser_access_token}'}
+    response = await make_request('/auth/roles/provide-bulk/', method='POST', body=body, headers=headers)
+    actual = response.status
+    expected = HTTPStatus.OK
+    assert actual == expected, f'Expected status {expected} but got {actual}'
+
+    actual = response.body
+    expected = {'detail': 'Role successfully provided to 1 users'}
+    assert actual == expected, f'Expected {expected} but got {actual}'
+
+    response = await make_request('/auth/roles/provide-bulk/', method='POST', body=body, headers=headers)
+    actual = response.body
+    expected = {'detail': 'Role successfully provided to 0 users'}
+    assert actual == expected, f'Expected {expected} but got {actual}'
+
+
+async def test_superuser_can_revoke_role_from_users(make_request, get_superuser_access_token, get_user_with_test_role,
+                                                    clear_test_data):
+    """
+    Test: POST /auth/roles/revoke-bulk/ endpoint - superuser can revoke role from several users.
+    """
+    user, role = get_user_with_test_role
+    response = await make_request('/auth/roles/revoke-bulk/', method='POST',
+                                  body={'user_ids': [str(user.id)], 'role_id': str(role.id)},
+                                  headers={'Authorization': f'Bearer {get_superuser_access_token}'})
+    actual = response.status
+    expected = HTTPStatus.OK
+    assert actual == expected, f'Expected status {expected} but got {actual}'
+
+    actual = response.body
+    expected = {'detail': 'Role successfully revoked from 1 users'}
+    assert actual == expected, f'Expected {expected} but got {actual}'
+
+
+async def test_not_superuser_cannot_provide_role_to_users(make_request, get_user_access_token, get_user_with_test_role,
+                                                          get_user_role, clear_test_data):
+    """
+    Test: POST /auth/roles/provide-bulk/ endpoint - user without 'superuser' role can't provide role to users.
+    """
+    user, role = get_user_with_test_role
+    response = await make_request('/auth/roles/provide-bulk/', method='POST',
+                                  body={'user_ids': [str(user.id)], 'role_id': str(get_user_role.id)},
+                                  headers={'Authorization': f'Bearer {get_user_access_token}'})
+    actual = response.status
+    expected = HTTPStatus.FORBIDDEN
+    assert actual == expected, f'Expected status {expected} but got {actual}'
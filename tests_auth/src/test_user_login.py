@@ -1,3 +1,4 @@
+import asyncio
 from http import HTTPStatus
 import uuid
 
@@ -52,6 +53,29 @@ async def test_create_and_delete_user(make_request):
     assert response.status == HTTPStatus.OK
 
 
+async def test_deleted_user_is_not_authorized(make_request):
+
+    url = '/auth/signup/'
+    body = {'email': 'deleted@mail.ru', 'password': 'deleted_user', 'full_name': 'deleted'}
+    response = await make_request(url, method='POST', body=body)
+    user_id = response.body['id']
+
+    url = '/auth/login/'
+    body = {'email': 'deleted@mail.ru', 'password': 'deleted_user'}
+    response = await make_request(url, method='POST', body=body)
+    header = {'Authorization': f'Bearer {response.body["access_token"]}'}
+
+    # the user is cached by the first protected request
+    response = await make_request('/auth/login-history/', method='GET', headers=header)
+    assert response.status == HTTPStatus.OK
+
+    response = await make_request(f'/auth/users/{user_id}/', method='DELETE', headers=header)
+    assert response.status == HTTPStatus.OK
+
+    response = await make_request('/auth/login-history/', method='GET', headers=header)
+    assert response.status == HTTPStatus.NOT_FOUND
+
+
 async def test_get_users(make_request, get_user: User, get_user_access_token):
 
     url = '/auth/users/'
@@ -117,6 +141,94 @@ async def test_logout_user(make_request):
     assert response.status == HTTPStatus.UNAUTHORIZED
 
 
+
+async def test_token_is_in_black_list_after_logout(make_request):
+
+    url = '/auth/signup/'
+    body = {'email': 'blacklist@mail.ru', 'password': 'blacklist', 'full_name': 'blacklist'}
+    await make_request(url, method='POST', body=body)
+
+    url = '/auth/login/'
+    body = {'email': 'blacklist@mail.ru', 'password': 'blacklist'}
+    response = await make_request(url, method='POST', body=body)
+    access_t = response.body['access_token']
+
+    url = '/auth/tokens/is-in-black-list/'
+    response = await make_request(url, method='GET', params={'access_token': access_t})
+    assert response.status == HTTPStatus.OK
+    assert response.body == {'is_compromised': False}
+
+    header = {'Authorization': f'Bearer {access_t}'}
+    response = await make_request('/auth/logout/', method='POST', headers=header)
+    assert response.status == HTTPStatus.OK
+
+    response = await make_request(url, method='GET', params={'access_token': access_t})
+    assert response.status == HTTPStatus.OK
+    assert response.body == {'is_compromised': True}
+
+
+async def test_logout_keeps_other_sessions(make_request):
+
+    url = '/auth/signup/'
+    body = {'email': 'sessions@mail.ru', 'password': 'sessions', 'full_name': 'sessions'}
+    response = await make_request(url, method='POST', body=body)
+
+    url = '/auth/login/'
+    body = {'email': 'sessions@mail.ru', 'password': 'sessions'}
+    response = await make_request(url, method='POST', body=body)
+    first_access_t = response.body['access_token']
+    first_refresh_t = response.body['refresh_token']
+    response = await make_request(url, method='POST', body=body)
+    second_refresh_t = response.body['refresh_token']
+    assert response.status == HTTPStatus.OK
+
+    url = '/auth/logout/'
+    header = {'Authorization': f'Bearer {first_access_t}'}
+    response = await make_request(url, method='POST', headers=header)
+    assert response.status == HTTPStatus.OK
+
+    url = '/auth/refresh-token/'
+    header = {'Authorization': f'Bearer {first_refresh_t}'}
+    response = await make_request(url, method='POST', headers=header)
+    assert response.status == HTTPStatus.UNAUTHORIZED
+
+    header = {'Authorization': f'Bearer {second_refresh_t}'}
+    response = await make_request(url, method='POST', headers=header)
+    assert response.status == HTTPStatus.OK
+
+
+async def test_logout_all_sessions(make_request):
+
+    url = '/auth/signup/'
+    body = {'email': 'logout_all@mail.ru', 'password': 'logout_all', 'full_name': 'logout_all'}
+    response = await make_request(url, method='POST', body=body)
+
+    url = '/auth/login/'
+    body = {'email': 'logout_all@mail.ru', 'password': 'logout_all'}
+    response = await make_request(url, method='POST', body=body)
+    first_access_t = response.body['access_token']
+    first_refresh_t = response.body['refresh_token']
+    response = await make_request(url, method='POST', body=body)
+    second_access_t = response.body['access_token']
+    second_refresh_t = response.body['refresh_token']
+
+    url = '/auth/logout-all/'
+    header = {'Authorization': f'Bearer {first_access_t}'}
+    response = await make_request(url, method='POST', headers=header)
+    assert response.status == HTTPStatus.OK
+
+    url = '/auth/refresh-token/'
+    for refresh_t in (first_refresh_t, second_refresh_t):
+        header = {'Authorization': f'Bearer {refresh_t}'}
+        response = await make_request(url, method='POST', headers=header)
+        assert response.status == HTTPStatus.UNAUTHORIZED
+
+    url = '/auth/users/'
+    header = {'Authorization': f'Bearer {second_access_t}'}
+    response = await make_request(url, method='GET', headers=header)
+    assert response.status == HTTPStatus.UNAUTHORIZED
+
+
 async def test_history_logins(make_request, session):
 
     url = '/auth/signup/'
@@ -144,6 +256,8 @@ async def test_history_logins(make_request, session):
 
     expected = paginate['items']
     assert len(expected) == 5
+    dates = [item['date'] for item in expected]
+    assert dates == sorted(dates, reverse=True)
 
     expected = paginate['next_num']
     assert expected == 3
@@ -159,6 +273,63 @@ async def test_history_logins(make_request, session):
     response = await make_request(url, method='DELETE', headers=header)
 
 
+async def test_login_upgrades_password_hash(make_request, sqlalchemy_session):
+
+    user = User('rehash@mail.ru', 'rehash_password')
+    user.set_password('rehash_password', rounds=4)
+    sqlalchemy_session.add(user)
+    sqlalchemy_session.commit()
+
+    url = '/auth/login/'
+    body = {'email': 'rehash@mail.ru', 'password': 'rehash_password'}
+    response = await make_request(url, method='POST', body=body)
+    assert response.status == HTTPStatus.OK
+
+    sqlalchemy_session.refresh(user)
+    # the hash is '$2b$<cost>$...', it is made again with the target cost
+    assert user.password.split(b'$')[2] != b'04'
+    assert user.check_password('rehash_password')
+
+    sqlalchemy_session.delete(user)
+    sqlalchemy_session.commit()
+
+
+async def test_password_hashing_stats(make_request, get_superuser_access_token):
+
+    url = '/auth/internal/password-hashing/stats/'
+    header = {'Authorization': f'Bearer {get_superuser_access_token}'}
+    response = await make_request(url, method='GET', headers=header)
+    assert response.status == HTTPStatus.OK
+    assert {'hashed', 'rejected', 'queue_depth', 'wait_ms', 'hash_ms'} <= response.body.keys()
+
+
+async def test_password_hashing_busy(make_request, get_user, get_user_data):
+    # the service is tested with one hashing worker and no queue (see docker-compose.yml), so the concurrent logins
+    # which find the worker busy are rejected at once
+    body = {'email': get_user_data['email'], 'password': get_user_data['password']}
+    responses = await asyncio.gather(*[make_request('/auth/login/', method='POST', body=body) for _ in range(5)])
+
+    statuses = [response.status for response in responses]
+    assert set(statuses) <= {HTTPStatus.OK, HTTPStatus.SERVICE_UNAVAILABLE}
+    assert HTTPStatus.OK in statuses
+    assert HTTPStatus.SERVICE_UNAVAILABLE in statuses
+    for response in responses:
+        if response.status == HTTPStatus.SERVICE_UNAVAILABLE:
+            assert 'error' in response.body
+            assert int(response.headers['Retry-After']) > 0
+
+
+async def test_password_hashing_stats_superuser_only(make_request, get_user, get_user_access_token):
+
+    url = '/auth/internal/password-hashing/stats/'
+    response = await make_request(url, method='GET')
+    assert response.status == HTTPStatus.UNAUTHORIZED
+
+    header = {'Authorization': f'Bearer {get_user_access_token}'}
+    response = await make_request(url, method='GET', headers=header)
+    assert response.status == HTTPStatus.FORBIDDEN
+
+
 async def test_unauthorized_user(make_request):
 
     url = '/auth/refresh-token/'
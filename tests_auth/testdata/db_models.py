@@ -25,7 +25,6 @@ class User(Base):
     email = Column(String, unique=True, nullable=False)
     full_name = Column(String)
     password = Column(BYTEA, nullable=False)
-    salt = Column(BYTEA, nullable=False)
     roles = relationship('UserRole', secondary=users_user_roles, lazy='subquery', backref=backref('users', lazy=True))
     history_logs = relationship('LoginHistory', backref='user')
 
@@ -36,17 +35,14 @@ class User(Base):
             self.full_name = full_name
 
     @staticmethod
-    def encrypt_password(password: str) -> tuple[bytes, bytes]:
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode('utf8'), salt)
-        return hashed_password, salt
+    def encrypt_password(password: str, rounds: int = 12) -> bytes:
+        return bcrypt.hashpw(password.encode('utf8'), bcrypt.gensalt(rounds))
 
-    def set_password(self, password: str):
-        self.password, self.salt = self.encrypt_password(password)
+    def set_password(self, password: str, rounds: int = 12):
+        self.password = self.encrypt_password(password, rounds)
 
     def check_password(self, password: str) -> bool:
-        hashed_password = bcrypt.hashpw(password.encode('utf8'), self.salt)
-        return hashed_password == self.password
+        return bcrypt.checkpw(password.encode('utf8'), self.password)
 
     def __repr__(self):
         return f'<User: {self.email}>'